@@ -0,0 +1,260 @@
+import sys
+import os
+import time
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.convertors import Convertor, register_url_convertor
+from starlette.exceptions import HTTPException as StarletteHTTPException
+import orjson
+import uvicorn
+
+# Add the backend directory to the path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+if backend_path not in sys.path:
+    sys.path.append(backend_path)
+
+from backend.models.orchestrator import ModelOrchestrator
+from backend.memory.database import Database
+from backend.config.config import Config
+
+# Components are created on first use so a cold start only pays for what
+# the requested route needs (e.g. /api/models never builds the orchestrator)
+_config = None
+_db = None
+_orchestrator = None
+
+
+def get_config() -> Config:
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def get_db() -> Database:
+    global _db
+    if _db is None:
+        _db = Database()
+    return _db
+
+
+def get_orchestrator() -> ModelOrchestrator:
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = ModelOrchestrator(get_config(), get_db())
+    return _orchestrator
+
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+_CORS_RAW_HEADERS = [
+    (name.lower().encode('latin-1'), value.encode('latin-1'))
+    for name, value in _CORS_HEADERS.items()
+]
+
+# Header block shared by every JSON response, encoded once at import
+_JSON_CORS_RAW_HEADERS = [(b'content-type', b'application/json'), *_CORS_RAW_HEADERS]
+
+# Static CORS preflight answer; browsers may cache it for a day
+_PREFLIGHT_START = {
+    'type': 'http.response.start',
+    'status': 204,
+    'headers': [*_CORS_RAW_HEADERS, (b'access-control-max-age', b'86400'), (b'content-length', b'0')]
+}
+_PREFLIGHT_BODY = {'type': 'http.response.body', 'body': b''}
+
+
+class CORSJSONResponse(ORJSONResponse):
+    """orjson response that reuses the pre-encoded CORS header block"""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+    def init_headers(self, headers=None) -> None:
+        self.raw_headers = [(b'content-length', str(len(self.body)).encode('latin-1')), *_JSON_CORS_RAW_HEADERS]
+        if headers:
+            self.raw_headers.extend(
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()
+            )
+
+
+class ConversationIdConvertor(Convertor):
+    """Path segment matched by the route's compiled regex, so malformed ids never reach a handler"""
+
+    regex = '[A-Za-z0-9_-]+'
+
+    def convert(self, value: str) -> str:
+        return value
+
+    def to_string(self, value: str) -> str:
+        return value
+
+
+register_url_convertor('conversation_id', ConversationIdConvertor())
+
+class PreflightMiddleware:
+    """Answer OPTIONS requests with the static preflight response before routing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'OPTIONS':
+            await send(_PREFLIGHT_START)
+            await send(_PREFLIGHT_BODY)
+            return
+        await self.app(scope, receive, send)
+
+
+app = FastAPI(title="Ethos AI API", version="1.0.0", default_response_class=CORSJSONResponse)
+app.add_middleware(PreflightMiddleware)
+
+# key -> (monotonic timestamp, encoded body)
+_cache = {}
+
+
+def cached(key: str, ttl: Optional[float], fn) -> bytes:
+    """Return the orjson-encoded result of fn(), recomputed at most every ttl seconds
+
+    A ttl of None keeps the encoded body until invalidate_cache() is called.
+    """
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry and (ttl is None or now - entry[0] < ttl):
+        return entry[1]
+    body = orjson.dumps(fn())
+    _cache[key] = (now, body)
+    return body
+
+
+def invalidate_cache(key: str) -> None:
+    _cache.pop(key, None)
+
+
+async def _json_array(rows):
+    """Encode an async iterable of rows as a JSON array without materializing it"""
+    separator = b'['
+    async for row in rows:
+        yield separator + orjson.dumps(row)
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
+
+
+def _error(e: Exception) -> CORSJSONResponse:
+    return CORSJSONResponse({'error': str(e)}, status_code=500)
+
+
+# Stray probes and scans only ever get these, so their bodies are encoded once
+_STATUS_BODIES = {
+    404: b'{"detail":"Not Found"}',
+    405: b'{"detail":"Method Not Allowed"}'
+}
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception(request: Request, exc: StarletteHTTPException):
+    body = _STATUS_BODIES.get(exc.status_code)
+    if body is None:
+        return await http_exception_handler(request, exc)
+    return CORSJSONResponse(body, status_code=exc.status_code, headers=exc.headers)
+
+
+@app.get('/health')
+async def health():
+    response_data = {
+        'status': 'healthy',
+        'message': 'Ethos AI is running',
+        'version': '1.0.0'
+    }
+    return CORSJSONResponse(response_data)
+
+
+@app.post('/api/chat')
+async def chat(request: Request):
+    try:
+        # Get request body
+        request_data = orjson.loads(await request.body())
+
+        # Extract message and conversation_id
+        message = request_data.get('message', '')
+        conversation_id = request_data.get('conversation_id')
+        if not conversation_id:
+            # Start a conversation so the client learns the id to continue it with
+            conversation_id = await get_db().create_conversation()
+
+        # The orchestrator is async, so it runs on the event loop
+        response = await get_orchestrator().process_message(message, conversation_id=conversation_id)
+
+        response_data = {
+            'response': response.content,
+            'conversation_id': conversation_id,
+            'model_used': response.model_used,
+            'tools_called': response.tools_called
+        }
+        return CORSJSONResponse(response_data)
+
+    except Exception as e:
+        return _error(e)
+
+
+@app.get('/api/conversations')
+async def list_conversations():
+    try:
+        # Stream conversations as a JSON array, one encoded row at a time
+        return StreamingResponse(
+            _json_array(get_db().iter_conversations()),
+            media_type='application/json',
+            headers=_CORS_HEADERS
+        )
+
+    except Exception as e:
+        return _error(e)
+
+
+@app.delete('/api/conversations/{conversation_id:conversation_id}')
+async def delete_conversation(conversation_id: str):
+    try:
+        # Delete conversation
+        deleted = await get_db().delete_conversation(conversation_id)
+        return CORSJSONResponse({'success': deleted}, status_code=200 if deleted else 500)
+
+    except Exception as e:
+        return _error(e)
+
+
+@app.get('/api/models')
+async def list_models():
+    try:
+        # The model list only changes with the config, so it is encoded once
+        return CORSJSONResponse(cached('models', None, lambda: get_config().get_available_models()))
+
+    except Exception as e:
+        return _error(e)
+
+
+@app.post('/api/models/refresh')
+async def refresh_models():
+    """Drop the encoded model list so the next /api/models re-reads the config"""
+    invalidate_cache('models')
+    return CORSJSONResponse({'success': True})
+
+
+if __name__ == '__main__':
+    uvicorn.run(
+        'api.app:app',
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 8000)),
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+        loop='uvloop',
+        http='httptools',
+        # HTTP/1.1 keep-alive; every response carries Content-Length
+        timeout_keep_alive=int(os.environ.get('KEEP_ALIVE_TIMEOUT', 30))
+    )
@@ -1,69 +0,0 @@
-from http.server import BaseHTTPRequestHandler
-import json
-import sys
-import os
-
-# Add the backend directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
-
-from backend.memory.database import Database
-
-# Initialize database
-db = Database()
-
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/api/conversations':
-            try:
-                # Get all conversations
-                conversations = db.get_all_conversations()
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                
-                self.wfile.write(json.dumps(conversations).encode())
-                
-            except Exception as e:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
-    
-    def do_DELETE(self):
-        if self.path.startswith('/api/conversations/'):
-            try:
-                # Extract conversation ID from path
-                conversation_id = self.path.split('/')[-1]
-                
-                # Delete conversation
-                db.delete_conversation(conversation_id)
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                
-                self.wfile.write(json.dumps({'success': True}).encode())
-                
-            except Exception as e:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
-    
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers() 
\ No newline at end of file
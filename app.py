@@ -1,19 +1,115 @@
 import os
-import json
-import requests
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+import asyncio
+import time
 
-app = Flask(__name__)
-CORS(app)
+import aiohttp
+import orjson
+from flask.json.provider import JSONProvider
+from quart import Quart, request, jsonify
+from quart_cors import cors
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that routes jsonify/get_json through orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
+app = cors(app, allow_origin='*', max_age=86400)
 
 # Configuration
 OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'localhost')
 OLLAMA_PORT = os.environ.get('OLLAMA_PORT', '11434')
 ETHOS_API_URL = f"http://{OLLAMA_HOST}:{OLLAMA_PORT}"
+OLLAMA_POOL_SIZE = int(os.environ.get('OLLAMA_POOL_SIZE', '64'))
+HEALTH_CACHE_TTL = float(os.environ.get('ETHOS_HEALTH_CACHE_TTL', '2'))
+
+# (monotonic timestamp, encoded body) of the last healthy /health probe
+_health_cache = (0.0, None)
+# Monotonic timestamp of the last successful Ollama response from any handler
+_last_ollama_ok = 0.0
+_HEALTHY_BYTES = orjson.dumps({'status': 'healthy', 'ollama_connected': True})
+
+
+def mark_ollama_ok():
+    """Record that Ollama just answered successfully"""
+    global _last_ollama_ok
+    _last_ollama_ok = time.monotonic()
+
+
+# (model, prompt) -> task generating it; identical concurrent /chat calls share one Ollama request
+_inflight_generates = {}
+
+
+async def _generate(model: str, prompt: str):
+    """Call Ollama /api/generate and return (status, body bytes)"""
+    async with app.session.post(
+        f"{ETHOS_API_URL}/api/generate",
+        json={'model': model, 'prompt': prompt, 'stream': False},
+        timeout=aiohttp.ClientTimeout(total=120)  # 2 minute timeout
+    ) as response:
+        result = (response.status, await response.read())
+    if result[0] == 200:
+        mark_ollama_ok()
+    return result
+
+
+def submit_generate(model: str, prompt: str) -> asyncio.Task:
+    """Return the task answering (model, prompt), joining one already in flight"""
+    key = (model, prompt)
+    task = _inflight_generates.get(key)
+    if task is None:
+        task = asyncio.create_task(_generate(model, prompt))
+        _inflight_generates[key] = task
+        task.add_done_callback(lambda _: _inflight_generates.pop(key, None))
+    return task
+
+
+async def stream_generate(model: str, prompt: str):
+    """Yield Ollama /api/generate NDJSON lines without buffering the completion"""
+    async with app.session.post(
+        f"{ETHOS_API_URL}/api/generate",
+        json={'model': model, 'prompt': prompt, 'stream': True},
+        timeout=aiohttp.ClientTimeout(total=None, sock_read=120)
+    ) as response:
+        if response.status != 200:
+            yield orjson.dumps({
+                'error': f'Ollama API error: {response.status}',
+                'details': (await response.read()).decode('utf-8', errors='replace')
+            }) + b'\n'
+            return
+        mark_ollama_ok()
+        async for line in response.content:
+            yield line
+
+
+@app.before_serving
+async def startup():
+    """Open the shared Ollama connection pool"""
+    app.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=256,
+            limit_per_host=OLLAMA_POOL_SIZE,
+            keepalive_timeout=60,
+            ttl_dns_cache=300
+        ),
+        json_serialize=lambda obj: orjson.dumps(obj).decode('utf-8')
+    )
+
+
+@app.after_serving
+async def shutdown():
+    """Close the shared Ollama connection pool"""
+    await app.session.close()
 
 @app.route('/')
-def home():
+async def home():
     """Home endpoint"""
     return jsonify({
         'message': 'Ethos AI API for Cooking With!',
@@ -22,17 +118,30 @@ def home():
     })
 
 @app.route('/health')
-def health_check():
+async def health_check():
     """Health check endpoint"""
+    global _health_cache
+    now = time.monotonic()
+    cached_at, cached_body = _health_cache
+    if cached_body is not None and now - cached_at < HEALTH_CACHE_TTL:
+        return app.response_class(cached_body, mimetype='application/json')
+    if now - _last_ollama_ok < HEALTH_CACHE_TTL:
+        # Another handler just reached Ollama, no need to probe it again
+        return app.response_class(cached_body or _HEALTHY_BYTES, mimetype='application/json')
     try:
         # Check if Ollama is running
-        response = requests.get(f"{ETHOS_API_URL}/api/tags", timeout=5)
-        if response.status_code == 200:
-            return jsonify({
+        async with app.session.get(f"{ETHOS_API_URL}/api/tags", timeout=aiohttp.ClientTimeout(total=5)) as response:
+            status = response.status
+            body = await response.read()
+        if status == 200:
+            healthy_body = orjson.dumps({
                 'status': 'healthy',
                 'ollama_connected': True,
-                'models': response.json().get('models', [])
+                'models': orjson.loads(body).get('models', [])
             })
+            mark_ollama_ok()
+            _health_cache = (_last_ollama_ok, healthy_body)
+            return app.response_class(healthy_body, mimetype='application/json')
         else:
             return jsonify({
                 'status': 'unhealthy',
@@ -47,10 +156,10 @@ def health_check():
         }), 503
 
 @app.route('/chat', methods=['POST'])
-def chat():
+async def chat():
     """Main chat endpoint for Ethos AI"""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
             
@@ -61,60 +170,60 @@ def chat():
         if not content:
             return jsonify({'error': 'Content is required'}), 400
         
-        # Prepare request for Ollama
-        ollama_request = {
-            'model': model_override,
-            'prompt': content,
-            'stream': False
-        }
+        if data.get('stream', False):
+            # Forward Ollama's NDJSON chunks as they are generated
+            return app.response_class(stream_generate(model_override, content), mimetype='application/x-ndjson')
         
-        # Make request to Ollama
-        response = requests.post(
-            f"{ETHOS_API_URL}/api/generate",
-            json=ollama_request,
-            timeout=120  # 2 minute timeout
-        )
+        # Make request to Ollama (shared with identical concurrent chats); shielded
+        # so one caller timing out does not cancel the others' reply
+        status, body = await asyncio.wait_for(asyncio.shield(submit_generate(model_override, content)), 120)
         
-        if response.status_code != 200:
+        if status != 200:
             return jsonify({
-                'error': f'Ollama API error: {response.status_code}',
-                'details': response.text
+                'error': f'Ollama API error: {status}',
+                'details': body.decode('utf-8', errors='replace')
             }), 500
         
-        ollama_response = response.json()
+        ollama_response = orjson.loads(body)
+        prompt_tokens = ollama_response.get('prompt_eval_count', 0)
+        completion_tokens = ollama_response.get('eval_count', 0)
         
-        return jsonify({
+        return app.response_class(orjson.dumps({
             'content': ollama_response.get('response', ''),
             'model_used': model_override,
             'usage': {
-                'prompt_tokens': ollama_response.get('prompt_eval_count', 0),
-                'completion_tokens': ollama_response.get('eval_count', 0),
-                'total_tokens': ollama_response.get('prompt_eval_count', 0) + ollama_response.get('eval_count', 0)
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
             }
-        })
+        }), mimetype='application/json')
         
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return jsonify({'error': 'Request timeout'}), 408
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 @app.route('/models', methods=['GET'])
-def list_models():
+async def list_models():
     """List available models"""
     try:
-        response = requests.get(f"{ETHOS_API_URL}/api/tags", timeout=10)
-        if response.status_code == 200:
-            return jsonify(response.json())
+        async with app.session.get(f"{ETHOS_API_URL}/api/tags", timeout=aiohttp.ClientTimeout(total=10)) as response:
+            status = response.status
+            body = await response.read()
+        if status == 200:
+            mark_ollama_ok()
+            # Pass Ollama's JSON through untouched
+            return app.response_class(body, mimetype='application/json')
         else:
             return jsonify({'error': 'Failed to fetch models'}), 500
     except Exception as e:
         return jsonify({'error': f'Error fetching models: {str(e)}'}), 500
 
 @app.route('/pull', methods=['POST'])
-def pull_model():
+async def pull_model():
     """Pull a model from Ollama"""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
             
@@ -124,20 +233,25 @@ def pull_model():
             return jsonify({'error': 'Model name is required'}), 400
         
         # Start model pull
-        response = requests.post(
+        async with app.session.post(
             f"{ETHOS_API_URL}/api/pull",
             json={'name': model_name},
-            timeout=300  # 5 minute timeout for model download
-        )
+            timeout=aiohttp.ClientTimeout(total=300)  # 5 minute timeout for model download
+        ) as response:
+            status = response.status
+            text = await response.text()
         
-        if response.status_code == 200:
+        if status == 200:
+            mark_ollama_ok()
             return jsonify({'message': f'Model {model_name} pulled successfully'})
         else:
-            return jsonify({'error': f'Failed to pull model: {response.text}'}), 500
+            return jsonify({'error': f'Failed to pull model: {text}'}), 500
             
     except Exception as e:
         return jsonify({'error': f'Error pulling model: {str(e)}'}), 500
 
 if __name__ == '__main__':
+    import uvicorn
+    
     port = int(os.environ.get('PORT', 8000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    uvicorn.run(app, host='0.0.0.0', port=port, loop='uvloop', http='httptools')
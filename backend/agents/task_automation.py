@@ -6,19 +6,67 @@ Enables multi-step workflows, scheduled tasks, and automated actions
 import asyncio
 import logging
 import time
-import json
+import heapq
+import copy
+import hashlib
+import random
+import shlex
 import uuid
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
-import aioschedule
 import os
 import shutil
+import importlib.util
 from pathlib import Path
 
+import httpx
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Step retry backoff: min(2 ** attempt, cap) seconds plus up to RETRY_JITTER seconds
+RETRY_BACKOFF_CAP = 30
+RETRY_JITTER = 1.0
+
+# Seconds a finished task stays in memory; after that only its stored copy remains
+TASK_RETENTION_SECONDS = 3600
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Task rows are written at most PERSIST_BATCH_SIZE at a time, PERSIST_FLUSH_INTERVAL seconds after the first one queued
+PERSIST_BATCH_SIZE = 128
+PERSIST_FLUSH_INTERVAL = 0.05
+
+# Executables system_command steps may run
+_SAFE_COMMANDS = frozenset({'ls', 'dir', 'pwd', 'echo', 'date', 'whoami'})
+
+# Concurrent orchestrator calls allowed per model from automation steps
+LLM_CONCURRENCY_PER_MODEL = 4
+
+# Step prompt responses kept for reuse by identical later steps, for at most PROMPT_CACHE_TTL seconds
+PROMPT_CACHE_SIZE = 256
+PROMPT_CACHE_TTL = 60
+
+# Concurrent steps allowed per resource pool, overridable through TaskAutomation(pool_sizes=...)
+DEFAULT_POOL_SIZES = {'llm': 8, 'vision': 2, 'http': 32, 'fs': 16}
+
+# Resource pool each action draws from; actions not listed run unthrottled
+ACTION_POOLS = {
+    'send_message': 'llm',
+    'web_search': 'llm',
+    'data_analysis': 'llm',
+    'code_execution': 'llm',
+    'data_extraction': 'llm',
+    'content_generation': 'llm',
+    'api_call': 'http',
+    'process_file': 'fs',
+    'file_operation': 'fs'
+}
+
 class TaskStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -26,6 +74,8 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+_TERMINAL_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED})
+
 class TaskType(Enum):
     WORKFLOW = "workflow"
     SCHEDULED = "scheduled"
@@ -34,7 +84,7 @@ class TaskType(Enum):
     WEB_ACTION = "web_action"
     DATA_ANALYSIS = "data_analysis"
 
-@dataclass
+@dataclass(slots=True)
 class TaskStep:
     """A single step in a task workflow"""
     id: str
@@ -51,7 +101,7 @@ class TaskStep:
     start_time: Optional[float] = None
     end_time: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """A complete task with multiple steps"""
     id: str
@@ -69,19 +119,48 @@ class Task:
     metadata: Dict[str, Any] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    _step_index: Dict[str, TaskStep] = field(default_factory=dict, repr=False)  # step id -> step
 
 class TaskAutomation:
     """Main task automation system"""
     
-    def __init__(self, database, orchestrator):
+    def __init__(
+        self,
+        database,
+        orchestrator,
+        task_retention: float = TASK_RETENTION_SECONDS,
+        llm_concurrency_per_model: int = LLM_CONCURRENCY_PER_MODEL,
+        pool_sizes: Optional[Dict[str, int]] = None
+    ):
         self.database = database
         self.orchestrator = orchestrator
-        self.tasks: Dict[str, Task] = {}
+        # Insertion order is creation order, so get_tasks never has to sort
+        self.tasks: OrderedDict[str, Task] = OrderedDict()
+        # Status -> ids of tasks currently in it; keep in sync through _set_status
+        self._tasks_by_status: Dict[TaskStatus, set] = {status: set() for status in TaskStatus}
+        self.task_retention = task_retention
         self.running_tasks: Dict[str, asyncio.Task] = {}
-        self.scheduler = aioschedule.Scheduler()
         self.task_handlers = self._register_task_handlers()
-        self.file_processor = FileProcessor(database, orchestrator)
-        self.web_automation = WebAutomation(orchestrator)
+        # Static checks run once in create_task instead of on every execution
+        self._validators: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "system_command": self._validate_system_command
+        }
+        # Stateless prompts from steps go through the dispatcher; send_message keeps its conversation
+        self.llm = PromptDispatcher(orchestrator, llm_concurrency_per_model)
+        self.file_processor = FileProcessor(database, self.llm)
+        self.web_automation = WebAutomation(self.llm)
+        self._pools = {
+            name: asyncio.Semaphore(size)
+            for name, size in {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}.items()
+        }
+        self._http_client = None  # Shared httpx.AsyncClient, created on first api_call
+        # Scheduled tasks: min-heap of (scheduled_for, task_id) drained by one scheduler coroutine
+        self._sched_heap: List[Tuple[float, str]] = []
+        self._sched_wakeup: Optional[asyncio.Event] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+        # Write-behind persistence: task rows queued on every transition, written in batches
+        self._persist_q: asyncio.Queue = asyncio.Queue()
+        self._persist_task: Optional[asyncio.Task] = None
         
     def _register_task_handlers(self) -> Dict[str, Callable]:
         """Register all available task handlers"""
@@ -116,6 +195,9 @@ class TaskAutomation:
                     timeout=step_data.get('timeout', 300),
                     max_retries=step_data.get('max_retries', 3)
                 )
+                validator = self._validators.get(step.action)
+                if validator:
+                    validator(step.parameters)
                 steps.append(step)
             
             task = Task(
@@ -128,10 +210,12 @@ class TaskAutomation:
                 scheduled_for=task_data.get('scheduled_for'),
                 priority=task_data.get('priority', 5),
                 tags=task_data.get('tags', []),
-                metadata=task_data.get('metadata', {})
+                metadata=task_data.get('metadata', {}),
+                _step_index={step.id: step for step in steps}
             )
             
             self.tasks[task_id] = task
+            self._tasks_by_status[task.status].add(task_id)
             
             # Schedule if needed
             if task.scheduled_for:
@@ -147,23 +231,28 @@ class TaskAutomation:
             logger.error(f"Error creating task: {e}")
             raise
     
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """Change a task's status and move it between the status index buckets"""
+        self._tasks_by_status[task.status].discard(task.id)
+        task.status = status
+        self._tasks_by_status[status].add(task.id)
+    
     async def execute_task(self, task_id: str) -> Task:
         """Execute a task"""
         if task_id not in self.tasks:
             raise ValueError(f"Task {task_id} not found")
         
         task = self.tasks[task_id]
-        task.status = TaskStatus.RUNNING
+        self._set_status(task, TaskStatus.RUNNING)
         task.started_at = time.time()
         
         try:
             logger.info(f"Executing task: {task.name}")
             
-            # Execute steps in order, respecting dependencies
-            for step in task.steps:
-                await self._execute_step(step, task)
+            # Execute steps as soon as their dependencies complete
+            await self._execute_steps(task)
             
-            task.status = TaskStatus.COMPLETED
+            self._set_status(task, TaskStatus.COMPLETED)
             task.completed_at = time.time()
             
             # Update database
@@ -173,68 +262,175 @@ class TaskAutomation:
             return task
             
         except Exception as e:
-            task.status = TaskStatus.FAILED
+            self._set_status(task, TaskStatus.FAILED)
             task.error = str(e)
             task.completed_at = time.time()
             await self._update_task(task)
             logger.error(f"Task failed: {task.name} - {e}")
             raise
     
-    async def _execute_step(self, step: TaskStep, task: Task) -> None:
-        """Execute a single task step"""
-        step.status = TaskStatus.RUNNING
-        step.start_time = time.time()
+    async def _execute_steps(self, task: Task) -> None:
+        """Run the step DAG with Kahn's algorithm, launching each step once its dependencies complete"""
+        if all(not s.dependencies for s in task.steps):
+            # No edges to track: launch every step at once, the first failure cancels the rest
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for step in task.steps:
+                        group.create_task(self._execute_step(step, task))
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0] from None
+            return
         
+        indegree = {s.id: 0 for s in task.steps}
+        successors = defaultdict(list)
+        for step in task.steps:
+            for dep_id in step.dependencies or []:
+                if dep_id not in task._step_index:
+                    raise Exception(f"Dependency {dep_id} not completed")
+                indegree[step.id] += 1
+                successors[dep_id].append(step)
+        
+        running = {
+            asyncio.create_task(self._execute_step(s, task)): s
+            for s in task.steps if indegree[s.id] == 0
+        }
+        finished = 0
         try:
-            # Check dependencies
-            if step.dependencies:
-                for dep_id in step.dependencies:
-                    dep_step = next((s for s in task.steps if s.id == dep_id), None)
-                    if not dep_step or dep_step.status != TaskStatus.COMPLETED:
-                        raise Exception(f"Dependency {dep_id} not completed")
-            
-            # Execute the step
-            handler = self.task_handlers.get(step.action)
-            if not handler:
-                raise Exception(f"Unknown action: {step.action}")
-            
-            result = await handler(step.parameters, task)
-            step.result = result
-            step.status = TaskStatus.COMPLETED
-            step.end_time = time.time()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    future.result()  # Re-raise the step's failure
+                    finished += 1
+                    for successor in successors[step.id]:
+                        indegree[successor.id] -= 1
+                        if indegree[successor.id] == 0:
+                            running[asyncio.create_task(self._execute_step(successor, task))] = successor
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        if finished < len(task.steps):
+            raise Exception(f"Circular dependencies between steps of task {task.id}")
+    
+    async def _execute_step(self, step: TaskStep, task: Task) -> None:
+        """Execute a single task step; its dependencies have already completed"""
+        while True:
+            step.status = TaskStatus.RUNNING
+            step.start_time = time.time()
             
-        except Exception as e:
-            step.error = str(e)
-            step.status = TaskStatus.FAILED
-            step.end_time = time.time()
+            try:
+                # Execute the step
+                handler = self.task_handlers.get(step.action)
+                if not handler:
+                    raise Exception(f"Unknown action: {step.action}")
+                
+                pool = self._step_pool(step)
+                if pool is None:
+                    result = await handler(step.parameters, task)
+                else:
+                    async with pool:
+                        result = await handler(step.parameters, task)
+                step.result = result
+                step.status = TaskStatus.COMPLETED
+                step.end_time = time.time()
+                return
+                
+            except Exception as e:
+                step.error = str(e)
+                step.status = TaskStatus.FAILED
+                step.end_time = time.time()
+                
+                # Retry if possible
+                if step.retry_count >= step.max_retries:
+                    raise
             
-            # Retry if possible
-            if step.retry_count < step.max_retries:
-                step.retry_count += 1
-                step.status = TaskStatus.PENDING
-                step.error = None
-                step.start_time = None
-                step.end_time = None
-                logger.info(f"Retrying step {step.name} (attempt {step.retry_count})")
-                await asyncio.sleep(2 ** step.retry_count)  # Exponential backoff
-                await self._execute_step(step, task)
-            else:
-                raise
+            step.retry_count += 1
+            step.status = TaskStatus.PENDING
+            step.error = None
+            step.start_time = None
+            step.end_time = None
+            logger.info(f"Retrying step {step.name} (attempt {step.retry_count})")
+            # Capped exponential backoff with jitter so failing steps don't retry in lockstep
+            delay = min(2 ** step.retry_count, RETRY_BACKOFF_CAP) + random.uniform(0, RETRY_JITTER)
+            await asyncio.sleep(delay)
+    
+    def _step_pool(self, step: TaskStep) -> Optional[asyncio.Semaphore]:
+        """Semaphore of the resource pool the step's action uses, if any"""
+        name = ACTION_POOLS.get(step.action)
+        if name == 'fs' and step.action == 'process_file':
+            # Image analysis runs on a vision model, which gets its own smaller pool
+            if self.file_processor.file_kind(step.parameters.get('file_path') or '') == 'image':
+                name = 'vision'
+        return self._pools.get(name)
     
     async def _schedule_task(self, task: Task) -> None:
         """Schedule a task for later execution"""
         if not task.scheduled_for:
             return
         
-        scheduled_time = datetime.fromtimestamp(task.scheduled_for)
-        
-        async def scheduled_execution():
-            await asyncio.sleep(task.scheduled_for - time.time())
-            await self.execute_task(task.id)
-        
-        # Schedule the task
-        self.scheduler.every().day.at(scheduled_time.strftime("%H:%M")).do(scheduled_execution)
-        logger.info(f"Scheduled task {task.name} for {scheduled_time}")
+        self._push_scheduled(task)
+        logger.info(f"Scheduled task {task.name} for {datetime.fromtimestamp(task.scheduled_for)}")
+    
+    def _push_scheduled(self, task: Task) -> None:
+        heapq.heappush(self._sched_heap, (task.scheduled_for, task.id))
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._sched_wakeup = asyncio.Event()
+            self._scheduler_task = asyncio.create_task(self._scheduler_loop())
+        else:
+            # Let the scheduler re-check in case this task is now the earliest
+            self._sched_wakeup.set()
+    
+    async def _scheduler_loop(self) -> None:
+        """Sleep until the earliest scheduled task is due, start it, repeat until none are left"""
+        while self._sched_heap:
+            scheduled_for, task_id = self._sched_heap[0]
+            delay = scheduled_for - time.time()
+            if delay > 0:
+                self._sched_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._sched_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self._sched_heap)
+            task = self.tasks.get(task_id)
+            if task and task.status == TaskStatus.PENDING:
+                runner = asyncio.create_task(self.execute_task(task_id))
+                self.running_tasks[task_id] = runner
+                runner.add_done_callback(lambda _, tid=task_id: self._scheduled_run_done(tid))
+    
+    def _scheduled_run_done(self, task_id: str) -> None:
+        self.running_tasks.pop(task_id, None)
+        task = self.tasks.get(task_id)
+        if task and task.status == TaskStatus.COMPLETED and self._is_recurring(task):
+            self._reschedule_recurring(task)
+    
+    @staticmethod
+    def _is_recurring(task: Task) -> bool:
+        """Whether the task reruns on a repeat_every interval; each run must see fresh answers"""
+        return bool((task.metadata or {}).get('repeat_every'))
+    
+    def _reschedule_recurring(self, task: Task) -> None:
+        """Reset a task whose metadata sets repeat_every (seconds) and queue its next run"""
+        for step in task.steps:
+            step.status = TaskStatus.PENDING
+            step.retry_count = 0
+            step.result = None
+            step.error = None
+            step.start_time = None
+            step.end_time = None
+        self._set_status(task, TaskStatus.PENDING)
+        task.started_at = None
+        task.completed_at = None
+        task.result = None
+        # Runs missed while the previous one was executing collapse into one immediate run
+        task.scheduled_for = max(task.scheduled_for + task.metadata['repeat_every'], time.time())
+        self._push_scheduled(task)
+        logger.info(f"Rescheduled recurring task {task.name} for {datetime.fromtimestamp(task.scheduled_for)}")
     
     # Task Handlers
     async def _handle_send_message(self, parameters: Dict[str, Any], task: Task) -> Dict[str, Any]:
@@ -278,10 +474,11 @@ class TaskAutomation:
         # Use the orchestrator to analyze data
         prompt = f"Please analyze the following data source: {data_source}. Analysis type: {analysis_type}"
         
-        response = await self.orchestrator.process_message(
+        response = await self.llm.process_message(
             prompt,
             model_override='claude-3.5',  # Good for analysis
-            use_tools=True
+            use_tools=True,
+            no_cache=self._is_recurring(task)
         )
         
         return {
@@ -295,14 +492,15 @@ class TaskAutomation:
         source = parameters.get('source')
         destination = parameters.get('destination')
         
+        # Filesystem calls run in a worker thread so large copies don't stall the event loop
         if operation == 'copy':
-            shutil.copy2(source, destination)
+            await asyncio.to_thread(shutil.copy2, source, destination)
         elif operation == 'move':
-            shutil.move(source, destination)
+            await asyncio.to_thread(shutil.move, source, destination)
         elif operation == 'delete':
-            os.remove(source)
+            await asyncio.to_thread(os.remove, source)
         elif operation == 'create_directory':
-            os.makedirs(source, exist_ok=True)
+            await asyncio.to_thread(os.makedirs, source, exist_ok=True)
         
         return {'success': True, 'operation': operation}
     
@@ -349,10 +547,11 @@ class TaskAutomation:
         # Use the orchestrator to execute code
         prompt = f"Please execute this {language} code and provide the result:\n\n{code}"
         
-        response = await self.orchestrator.process_message(
+        response = await self.llm.process_message(
             prompt,
             model_override='codellama-7b',  # Good for code
-            use_tools=True
+            use_tools=True,
+            no_cache=self._is_recurring(task)
         )
         
         return {
@@ -367,21 +566,41 @@ class TaskAutomation:
         headers = parameters.get('headers', {})
         data = parameters.get('data')
         
-        import httpx
+        method = method.upper()
+        if method not in ('GET', 'POST'):
+            raise Exception(f"Unsupported HTTP method: {method}")
         
-        async with httpx.AsyncClient() as client:
-            if method.upper() == 'GET':
-                response = await client.get(url, headers=headers)
-            elif method.upper() == 'POST':
-                response = await client.post(url, headers=headers, json=data)
-            else:
-                raise Exception(f"Unsupported HTTP method: {method}")
+        # Only POST carries the data as a JSON body
+        content = None
+        if method == 'POST' and data is not None:
+            content = _dumps(data)
+            headers = httpx.Headers(headers)
+            headers.setdefault('Content-Type', 'application/json')
         
-        return {
+        response = await self._get_http_client().request(method, url, headers=headers, content=content)
+        
+        result = {
             'status_code': response.status_code,
             'response': response.text,
             'headers': dict(response.headers)
         }
+        if response.headers.get('content-type', '').startswith('application/json'):
+            # Parsed once here so downstream steps don't re-decode the text
+            try:
+                result['json'] = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                pass
+        return result
+    
+    def _get_http_client(self):
+        """Return the pooled HTTP/2 client shared by all api_call steps"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._http_client
     
     async def _handle_data_extraction(self, parameters: Dict[str, Any], task: Task) -> Dict[str, Any]:
         """Extract data from various sources"""
@@ -390,10 +609,11 @@ class TaskAutomation:
         
         prompt = f"Please extract {extraction_type} data from: {source}"
         
-        response = await self.orchestrator.process_message(
+        response = await self.llm.process_message(
             prompt,
             model_override='claude-3.5',
-            use_tools=True
+            use_tools=True,
+            no_cache=self._is_recurring(task)
         )
         
         return {
@@ -409,10 +629,11 @@ class TaskAutomation:
         
         prompt = f"Please generate {content_type} content about: {topic}. Length: {length}"
         
-        response = await self.orchestrator.process_message(
+        response = await self.llm.process_message(
             prompt,
             model_override='gpt-4',  # Good for content generation
-            use_tools=False
+            use_tools=False,
+            no_cache=self._is_recurring(task)
         )
         
         return {
@@ -423,35 +644,104 @@ class TaskAutomation:
     
     async def _handle_system_command(self, parameters: Dict[str, Any], task: Task) -> Dict[str, Any]:
         """Execute system commands (with safety checks)"""
-        command = parameters.get('command', '')
-        
-        # Safety check - only allow safe commands
-        safe_commands = ['ls', 'dir', 'pwd', 'echo', 'date', 'whoami']
-        if command.split()[0] not in safe_commands:
-            raise Exception(f"Unsafe command: {command}")
-        
-        import subprocess
+        # create_task already rejected unsafe commands; this O(1) re-check guards
+        # parameters edited afterwards. Run without a shell
+        argv = self._validate_system_command(parameters)
         
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
         
         return {
-            'stdout': result.stdout,
-            'stderr': result.stderr,
-            'return_code': result.returncode
+            'stdout': stdout.decode(errors='replace'),
+            'stderr': stderr.decode(errors='replace'),
+            'return_code': process.returncode
         }
     
+    @staticmethod
+    def _validate_system_command(parameters: Dict[str, Any]) -> List[str]:
+        """Reject commands outside the allowlist or that don't parse; return the argv"""
+        command = parameters.get('command', '')
+        try:
+            argv = shlex.split(command)
+        except ValueError:
+            # e.g. an unterminated quote
+            argv = None
+        if not argv or argv[0] not in _SAFE_COMMANDS:
+            raise Exception(f"Unsafe command: {command}")
+        return argv
+    
     # Database operations
     async def _store_task(self, task: Task) -> None:
-        """Store task in database"""
-        # This would store the task in the database
-        # For now, we'll just log it
+        """Queue the new task for the next batched database write"""
         logger.info(f"Storing task: {task.id}")
+        self._enqueue_persist(task)
     
     async def _update_task(self, task: Task) -> None:
-        """Update task in database"""
-        # This would update the task in the database
-        # For now, we'll just log it
+        """Queue the task's new state for the next batched database write"""
         logger.info(f"Updating task: {task.id} - Status: {task.status}")
+        self._enqueue_persist(task)
+        
+        if task.status in _TERMINAL_STATUSES:
+            asyncio.get_running_loop().call_later(self.task_retention, self._evict_task, task.id)
+    
+    def _enqueue_persist(self, task: Task) -> None:
+        """Snapshot the task row; transitions never wait on a database round-trip"""
+        self._persist_q.put_nowait({
+            'id': task.id,
+            'name': task.name,
+            'task_type': task.task_type.value,
+            'status': task.status.value,
+            'priority': task.priority,
+            'created_at': task.created_at,
+            'scheduled_for': task.scheduled_for,
+            'started_at': task.started_at,
+            'completed_at': task.completed_at,
+            'error': task.error,
+            'metadata': task.metadata
+        })
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.create_task(self._persist_loop())
+    
+    async def _persist_loop(self) -> None:
+        """Write queued task rows in batches of up to PERSIST_BATCH_SIZE until aclose() queues None"""
+        while True:
+            row = await self._persist_q.get()
+            if row is None:
+                return
+            batch = [row]
+            # Give the transitions that follow a chance to join this write
+            await asyncio.sleep(PERSIST_FLUSH_INTERVAL)
+            while len(batch) < PERSIST_BATCH_SIZE and not self._persist_q.empty():
+                row = self._persist_q.get_nowait()
+                if row is None:
+                    await self._flush_persist(batch)
+                    return
+                batch.append(row)
+            await self._flush_persist(batch)
+    
+    async def _flush_persist(self, batch: List[Dict[str, Any]]) -> None:
+        # Only the latest snapshot of each task needs writing
+        rows = {}
+        for row in batch:
+            rows[row['id']] = row
+        try:
+            await self.database.upsert_tasks([
+                {**row, 'metadata': _dumps(row['metadata']).decode() if row['metadata'] else None}
+                for row in rows.values()
+            ])
+        except Exception as e:
+            logger.error(f"Error persisting {len(rows)} tasks: {e}")
+    
+    def _evict_task(self, task_id: str) -> None:
+        """Drop a finished task from memory unless it has been re-run since"""
+        task = self.tasks.get(task_id)
+        if task and task.status in _TERMINAL_STATUSES and task_id not in self.running_tasks:
+            del self.tasks[task_id]
+            self._tasks_by_status[task.status].discard(task_id)
     
     async def get_task(self, task_id: str) -> Optional[Task]:
         """Get a task by ID"""
@@ -459,11 +749,22 @@ class TaskAutomation:
     
     async def get_tasks(self, status: Optional[TaskStatus] = None) -> List[Task]:
         """Get all tasks, optionally filtered by status"""
-        tasks = list(self.tasks.values())
-        if status:
-            tasks = [t for t in tasks if t.status == status]
+        if not status:
+            return list(reversed(self.tasks.values()))
+        # Only the k tasks in this status are touched, not the whole history
+        tasks = [self.tasks[task_id] for task_id in self._tasks_by_status[status]]
         return sorted(tasks, key=lambda t: t.created_at, reverse=True)
     
+    async def aclose(self) -> None:
+        """Flush queued task writes and release pooled connections; call on shutdown"""
+        if self._persist_task is not None and not self._persist_task.done():
+            self._persist_q.put_nowait(None)
+            await self._persist_task
+        self._persist_task = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a running task"""
         if task_id in self.running_tasks:
@@ -471,12 +772,97 @@ class TaskAutomation:
             del self.running_tasks[task_id]
         
         if task_id in self.tasks:
-            self.tasks[task_id].status = TaskStatus.CANCELLED
+            self._set_status(self.tasks[task_id], TaskStatus.CANCELLED)
             await self._update_task(self.tasks[task_id])
             return True
         
         return False
 
+def _dumps(obj: Any) -> bytes:
+    """Serialize task payloads (dataclasses, datetimes, non-str keys) with orjson"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+async def _read_text(file_path: str) -> str:
+    """Read a UTF-8 text file in a worker thread"""
+    return await asyncio.to_thread(Path(file_path).read_text, encoding='utf-8')
+
+def _read_prefix_sync(file_path: str, length: int) -> str:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read(length)
+
+async def _read_text_prefix(file_path: str, length: int) -> str:
+    """Read only the first `length` characters of a UTF-8 text file in a worker thread"""
+    return await asyncio.to_thread(_read_prefix_sync, file_path, length)
+
+class PromptDispatcher:
+    """Funnels stateless prompts from automation steps into the orchestrator
+
+    The orchestrator has no batch API, so concurrency is capped per model
+    instead and identical prompts already in flight share one call. Finished
+    responses are kept briefly in a small LRU keyed by a digest of the prompt.
+    Tool-using prompts are never cached: tools read files, data sources and
+    the web, which can change while the prompt text stays the same.
+    """
+    
+    def __init__(
+        self,
+        orchestrator,
+        per_model_limit: int = LLM_CONCURRENCY_PER_MODEL,
+        cache_size: int = PROMPT_CACHE_SIZE,
+        cache_ttl: float = PROMPT_CACHE_TTL
+    ):
+        self.orchestrator = orchestrator
+        self._per_model_limit = per_model_limit
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        # key -> (monotonic timestamp, response)
+        self._cache: OrderedDict[bytes, Tuple[float, Any]] = OrderedDict()
+    
+    async def process_message(
+        self,
+        prompt: str,
+        model_override: Optional[str] = None,
+        use_tools: bool = True,
+        no_cache: bool = False
+    ):
+        """Answer a prompt; no_cache skips the response cache for time-sensitive queries"""
+        key = hashlib.blake2b(f"{model_override}\0{use_tools}\0{prompt}".encode(), digest_size=16).digest()
+        cacheable = not (no_cache or use_tools)
+        entry = self._cache.get(key) if cacheable else None
+        if entry is not None:
+            if time.monotonic() - entry[0] < self._cache_ttl:
+                self._cache.move_to_end(key)
+                return copy.copy(entry[1])
+            del self._cache[key]
+        
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._call(key, prompt, model_override, use_tools, cacheable))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled step must not cancel the call other steps are waiting on
+        return copy.copy(await asyncio.shield(future))
+    
+    async def _call(self, key: bytes, prompt: str, model_override: Optional[str], use_tools: bool, store: bool):
+        semaphore = self._semaphores.get(model_override)
+        if semaphore is None:
+            semaphore = self._semaphores[model_override] = asyncio.Semaphore(self._per_model_limit)
+        async with semaphore:
+            response = await self.orchestrator.process_message(
+                prompt,
+                model_override=model_override,
+                use_tools=use_tools
+            )
+        
+        # The orchestrator reports failures as a "fallback" response; those must not be reused
+        if store and self._cache_size > 0 and getattr(response, 'model_used', None) != 'fallback':
+            self._cache[key] = (time.monotonic(), response)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return response
+
 class FileProcessor:
     """Handles file processing tasks"""
     
@@ -489,6 +875,19 @@ class FileProcessor:
             'document': ['.pdf', '.doc', '.docx'],
             'data': ['.csv', '.xlsx', '.json']
         }
+        # Extension -> format; the first listed format wins (.json is handled as text)
+        self._ext_to_kind: Dict[str, str] = {}
+        for kind, extensions in self.supported_formats.items():
+            for ext in extensions:
+                self._ext_to_kind.setdefault(ext, kind)
+        self._analyze_handlers = {
+            'text': self._analyze_text_file,
+            'image': self._analyze_image_file
+        }
+    
+    def file_kind(self, file_path: str) -> Optional[str]:
+        """Supported format of a file ('text', 'image', ...) from its extension, or None"""
+        return self._ext_to_kind.get(Path(file_path).suffix.lower())
     
     async def process_file(self, file_path: str, operation: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Process a file based on operation type"""
@@ -512,50 +911,53 @@ class FileProcessor:
     
     async def _analyze_file(self, file_path: str, file_ext: str) -> Dict[str, Any]:
         """Analyze file content"""
-        if file_ext in self.supported_formats['text']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            prompt = f"Please analyze this file content and provide insights:\n\n{content[:2000]}..."
-            
-            response = await self.orchestrator.process_message(
-                prompt,
-                model_override='claude-3.5',
-                use_tools=True
-            )
-            
-            return {
-                'analysis': response.content,
-                'file_type': 'text',
-                'size': len(content)
-            }
+        handler = self._analyze_handlers.get(self._ext_to_kind.get(file_ext), self._analyze_unknown_file)
+        return await handler(file_path, file_ext)
+    
+    async def _analyze_text_file(self, file_path: str, file_ext: str) -> Dict[str, Any]:
+        # Only the prompt prefix is needed, so don't load the whole file
+        content = await _read_text_prefix(file_path, 2000)
+        size = await asyncio.to_thread(os.path.getsize, file_path)
         
-        elif file_ext in self.supported_formats['image']:
-            # For images, we'd use vision models
-            prompt = f"Please analyze this image: {file_path}"
-            
-            response = await self.orchestrator.process_message(
-                prompt,
-                model_override='llava-7b',  # Vision model
-                use_tools=True
-            )
-            
-            return {
-                'analysis': response.content,
-                'file_type': 'image'
-            }
+        prompt = f"Please analyze this file content and provide insights:\n\n{content}..."
         
-        else:
-            return {
-                'analysis': f"File type {file_ext} not fully supported for analysis",
-                'file_type': 'unknown'
-            }
+        response = await self.orchestrator.process_message(
+            prompt,
+            model_override='claude-3.5',
+            use_tools=True
+        )
+        
+        return {
+            'analysis': response.content,
+            'file_type': 'text',
+            'size': size
+        }
+    
+    async def _analyze_image_file(self, file_path: str, file_ext: str) -> Dict[str, Any]:
+        # For images, we'd use vision models
+        prompt = f"Please analyze this image: {file_path}"
+        
+        response = await self.orchestrator.process_message(
+            prompt,
+            model_override='llava-7b',  # Vision model
+            use_tools=True
+        )
+        
+        return {
+            'analysis': response.content,
+            'file_type': 'image'
+        }
+    
+    async def _analyze_unknown_file(self, file_path: str, file_ext: str) -> Dict[str, Any]:
+        return {
+            'analysis': f"File type {file_ext} not fully supported for analysis",
+            'file_type': 'unknown'
+        }
     
     async def _extract_text(self, file_path: str, file_ext: str) -> Dict[str, Any]:
         """Extract text from file"""
-        if file_ext in self.supported_formats['text']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        if self._ext_to_kind.get(file_ext) == 'text':
+            content = await _read_text(file_path)
             
             return {
                 'text': content,
@@ -566,11 +968,11 @@ class FileProcessor:
     
     async def _summarize_file(self, file_path: str, file_ext: str) -> Dict[str, Any]:
         """Summarize file content"""
-        if file_ext in self.supported_formats['text']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        if self._ext_to_kind.get(file_ext) == 'text':
+            content = await _read_text_prefix(file_path, 3000)
+            size = await asyncio.to_thread(os.path.getsize, file_path)
             
-            prompt = f"Please provide a concise summary of this content:\n\n{content[:3000]}..."
+            prompt = f"Please provide a concise summary of this content:\n\n{content}..."
             
             response = await self.orchestrator.process_message(
                 prompt,
@@ -580,7 +982,7 @@ class FileProcessor:
             
             return {
                 'summary': response.content,
-                'original_length': len(content)
+                'original_length': size
             }
         else:
             raise Exception(f"Summarization not supported for {file_ext}")
@@ -611,7 +1013,8 @@ class WebAutomation:
         response = await self.orchestrator.process_message(
             prompt,
             model_override='claude-3.5',
-            use_tools=True
+            use_tools=True,
+            no_cache=True  # Results go stale
         )
         
         return {
@@ -627,7 +1030,8 @@ class WebAutomation:
         response = await self.orchestrator.process_message(
             prompt,
             model_override='claude-3.5',
-            use_tools=True
+            use_tools=True,
+            no_cache=True  # Pages change
         )
         
         return {
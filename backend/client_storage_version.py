@@ -7,15 +7,21 @@ Uses real AI models via Ollama for actual responses
 PRODUCTION READY - No mock data
 """
 
-import json
 import hashlib
-import subprocess
 import time
 import os
+import asyncio
+import codecs
+import importlib.util
+import re
 import psutil
-from datetime import datetime
-from fastapi import FastAPI, HTTPException, UploadFile, File
+import httpx
+import orjson
+from collections import deque
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, List
 import logging
@@ -35,7 +41,11 @@ WEB_SEARCH_CONFIG = {
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Ethos AI - Production Client Storage", version="5.5.0-WEB-SEARCH-MEMORY")
+app = FastAPI(
+    title="Ethos AI - Production Client Storage",
+    version="5.5.0-WEB-SEARCH-MEMORY",
+    default_response_class=ORJSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -89,35 +99,89 @@ AVAILABLE_MODELS = {
     }
 }
 
+# Ollama HTTP API; one keep-alive client is shared by every request instead of
+# spawning an `ollama` CLI process per call
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+# How long Ollama keeps a model loaded after a generate call; every call resets the timer
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Models loaded at startup, highest priority first, so the first chat doesn't pay the cold load
+OLLAMA_WARMUP_COUNT = int(os.environ.get("OLLAMA_WARMUP_COUNT", "1"))
+# Generations in flight at once, sized to Ollama's parallel slots; set the same
+# OLLAMA_NUM_PARALLEL on the Ollama server so extra requests wait here instead
+# of oversubscribing the model
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+OLLAMA_SEM = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+# Pooled connections; must cover OLLAMA_NUM_PARALLEL generations plus model-list calls,
+# httpx's default of 10 would otherwise queue requests on the client side
+OLLAMA_POOL_SIZE = max(int(os.environ.get("OLLAMA_POOL_SIZE", "32")), OLLAMA_NUM_PARALLEL + 1)
+# HTTP/2 is negotiated when h2 is installed and OLLAMA_URL is https; plain http stays on HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+OLLAMA_CLIENT = httpx.AsyncClient(
+    base_url=OLLAMA_URL,
+    timeout=httpx.Timeout(60.0, connect=2.0),
+    # Limits and http2 belong to the transport once one is passed explicitly
+    transport=httpx.AsyncHTTPTransport(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=OLLAMA_POOL_SIZE, max_keepalive_connections=OLLAMA_POOL_SIZE),
+        # Retry a failed connect once, e.g. while Ollama is restarting
+        retries=1
+    )
+)
+
 # Check Ollama availability
 def check_ollama_availability():
-    """Check if Ollama is available"""
+    """Check if the Ollama server is reachable
+    
+    The model list from the same /api/tags call seeds the models cache, so
+    the first requests after startup need no Ollama round trip of their own.
+    """
     try:
-        result = subprocess.run(['ollama', '--version'], capture_output=True, text=True)
-        return result.returncode == 0
+        response = httpx.get(f"{OLLAMA_URL}/api/tags", timeout=httpx.Timeout(5.0, connect=1.0))
+        if response.status_code != 200:
+            return False
+        models = [model["name"] for model in response.json().get("models", [])]
+        _models_cache["data"] = models
+        _models_cache["ts"] = time.monotonic() if models else None
+        return True
     except Exception as e:
-        logger.error(f"Ollama not available: {e}")
+        logger.error("Ollama not available: %s", e)
         return False
 
 # Get available models from Ollama
-def get_available_ollama_models():
+async def get_available_ollama_models():
     """Get list of available models from Ollama"""
     try:
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            models = []
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        models.append(parts[0])
-            return models
+        response = await OLLAMA_CLIENT.get("/api/tags", timeout=10.0)
+        if response.status_code == 200:
+            return [model["name"] for model in response.json().get("models", [])]
         return []
     except Exception as e:
-        logger.error(f"Error getting Ollama models: {e}")
+        logger.error("Error getting Ollama models: %s", e)
         return []
 
+# Ollama's model list, refetched at most every MODELS_CACHE_TTL seconds
+MODELS_CACHE_TTL = 30
+_models_cache = {"ts": None, "data": []}
+
+async def get_available_ollama_models_cached():
+    """get_available_ollama_models, reused for MODELS_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if _models_cache["ts"] is None or now - _models_cache["ts"] >= MODELS_CACHE_TTL:
+        models = await get_available_ollama_models()
+        _models_cache["data"] = models
+        # An empty list usually means Ollama could not be reached; retry next call
+        _models_cache["ts"] = now if models else None
+    return _models_cache["data"]
+
+def invalidate_models_cache():
+    """Force the next cached lookup to refetch, e.g. after a model-not-found error"""
+    _models_cache["ts"] = None
+
+def current_time():
+    """Epoch seconds and the matching UTC ISO-8601 timestamp, read once per request"""
+    now = time.time()
+    return now, datetime.fromtimestamp(now, timezone.utc).isoformat().replace("+00:00", "Z")
+
 # RAM monitoring functions
 def get_system_ram_info():
     """Get current system RAM usage"""
@@ -130,76 +194,146 @@ def get_system_ram_info():
             "percent_used": round(memory.percent, 1)
         }
     except Exception as e:
-        logger.error(f"Error getting RAM info: {e}")
+        logger.error("Error getting RAM info: %s", e)
         return {"error": str(e)}
 
+# Ollama processes by PID; the full process table is only rescanned every
+# OLLAMA_PROC_RESCAN seconds, in between just these handles are read
+OLLAMA_PROC_RESCAN = 30
+_OLLAMA_PROC_CACHE: Dict[int, psutil.Process] = {}
+_OLLAMA_PROC_CACHE_TS = None
+
 def get_ollama_process_ram():
     """Get RAM usage of Ollama processes"""
+    global _OLLAMA_PROC_CACHE_TS
     try:
+        now = time.monotonic()
+        if _OLLAMA_PROC_CACHE_TS is None or now - _OLLAMA_PROC_CACHE_TS > OLLAMA_PROC_RESCAN:
+            _OLLAMA_PROC_CACHE.clear()
+            for proc in psutil.process_iter(['pid', 'name']):
+                if 'ollama' in (proc.info['name'] or '').lower():
+                    _OLLAMA_PROC_CACHE[proc.info['pid']] = proc
+            _OLLAMA_PROC_CACHE_TS = now
+        
         ollama_processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+        for pid, proc in list(_OLLAMA_PROC_CACHE.items()):
             try:
-                if 'ollama' in proc.info['name'].lower():
-                    memory_mb = proc.info['memory_info'].rss / (1024**2)
-                    ollama_processes.append({
-                        "pid": proc.info['pid'],
-                        "name": proc.info['name'],
-                        "ram_mb": round(memory_mb, 1)
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                memory_mb = proc.memory_info().rss / (1024**2)
+                ollama_processes.append({
+                    "pid": pid,
+                    "name": proc.info['name'],
+                    "ram_mb": round(memory_mb, 1)
+                })
+            except psutil.NoSuchProcess:
+                _OLLAMA_PROC_CACHE.pop(pid, None)
+            except psutil.AccessDenied:
                 continue
         return ollama_processes
     except Exception as e:
-        logger.error(f"Error getting Ollama RAM usage: {e}")
+        logger.error("Error getting Ollama RAM usage: %s", e)
         return []
 
+async def sample_ram():
+    """(system RAM, Ollama process RAM), read in worker threads so psutil never blocks the event loop"""
+    return await asyncio.gather(
+        asyncio.to_thread(get_system_ram_info),
+        asyncio.to_thread(get_ollama_process_ram)
+    )
+
+# On-disk size and RAM overhead of each Ollama model
+MODEL_SIZES = {
+    "phi:latest": {"size_gb": 1.6, "ram_multiplier": 1.2},
+    "sailor2:1b": {"size_gb": 1.1, "ram_multiplier": 1.2},
+    "llama2:latest": {"size_gb": 3.8, "ram_multiplier": 1.3},
+    "llama3.2:3b": {"size_gb": 3.4, "ram_multiplier": 1.3},
+    "codellama:7b": {"size_gb": 7.2, "ram_multiplier": 1.4}
+}
+
 def estimate_model_ram_usage(model_name: str):
     """Estimate RAM usage for a specific model based on its size"""
-    model_sizes = {
-        "phi:latest": {"size_gb": 1.6, "ram_multiplier": 1.2},
-        "sailor2:1b": {"size_gb": 1.1, "ram_multiplier": 1.2},
-        "llama2:latest": {"size_gb": 3.8, "ram_multiplier": 1.3},
-        "llama3.2:3b": {"size_gb": 3.4, "ram_multiplier": 1.3},
-        "codellama:7b": {"size_gb": 7.2, "ram_multiplier": 1.4}
-    }
-    
-    if model_name in model_sizes:
-        size_info = model_sizes[model_name]
+    if model_name in MODEL_SIZES:
+        size_info = MODEL_SIZES[model_name]
         estimated_ram = size_info["size_gb"] * size_info["ram_multiplier"]
         return round(estimated_ram, 1)
     return None
 
+# Per-model views of AVAILABLE_MODELS, built once; endpoints only fill in availability
+_MODEL_RAM_ESTIMATES = {
+    model_id: {
+        "name": model_info["name"],
+        "estimated_ram_gb": estimate_model_ram_usage(model_info["ollama_model"]),
+        "model_size": model_info["size"]
+    }
+    for model_id, model_info in AVAILABLE_MODELS.items()
+}
+
+_MODELS_STATIC = [
+    {
+        "id": model_id,
+        "name": model_info["name"],
+        "type": "real_ai",
+        "provider": "ollama",
+        "enabled": True,
+        "status": "downloadable",
+        "ollama_model": model_info["ollama_model"],
+        "capabilities": model_info["capabilities"],
+        "best_for": model_info["best_for"],
+        "size": model_info["size"],
+        "priority": model_info["priority"],
+        "fusion_capable": False,
+        "reason": f"Real AI model - {', '.join(model_info['best_for'])}"
+    }
+    for model_id, model_info in AVAILABLE_MODELS.items()
+]
+
+_MODELS_STATUS_STATIC = {
+    model_id: {
+        "model": model_info["ollama_model"],
+        "name": model_info["name"],
+        "size": model_info["size"]
+    }
+    for model_id, model_info in AVAILABLE_MODELS.items()
+}
+
+_OLLAMA_MODEL_NAMES = frozenset(model_info["ollama_model"] for model_info in AVAILABLE_MODELS.values())
+
+# Keyword sets for model selection, matched against whole words of the message.
+# Substring checks misfire on short words ("no" in "another", "if" in "notify"),
+# so common inflections are listed explicitly instead.
+CODING_KEYWORDS = frozenset({
+    "code", "coding", "program", "programming", "function", "functions", "bug", "bugs",
+    "error", "errors", "python", "javascript", "html", "css", "java", "c++", "debug",
+    "debugging", "algorithm", "algorithms", "api", "database", "class", "method",
+    "variable", "loop", "if", "else", "try", "catch"
+})
+COMPLEX_KEYWORDS = frozenset({
+    "analyze", "analyse", "explain", "compare", "evaluate", "design", "architecture",
+    "optimize", "performance", "security", "scalability"
+})
+SIMPLE_KEYWORDS = frozenset({"hello", "hi", "thanks", "ok", "yes", "no", "quick", "simple"})
+
+_WORD_RE = re.compile(r"[a-z+#]+")
+
 # Smart model selection
 def select_best_model(user_message: str, available_models: List[str]) -> str:
     """Select the best model for the given task"""
-    user_message_lower = user_message.lower()
-    
-    # Check for coding-related keywords
-    coding_keywords = ["code", "program", "function", "bug", "error", "python", "javascript", 
-                      "html", "css", "java", "c++", "debug", "algorithm", "api", "database",
-                      "class", "method", "variable", "loop", "if", "else", "try", "catch"]
-    
-    # Check for complex tasks
-    complex_keywords = ["analyze", "explain", "compare", "evaluate", "design", "architecture",
-                       "optimize", "performance", "security", "scalability"]
-    
-    # Check for simple/quick tasks
-    simple_keywords = ["hello", "hi", "thanks", "ok", "yes", "no", "quick", "simple"]
+    words = set(_WORD_RE.findall(user_message.lower()))
+    available_models = set(available_models)
     
     # Priority-based selection
-    if any(keyword in user_message_lower for keyword in coding_keywords):
+    if words & CODING_KEYWORDS:
         # Try 7B first, then 3B, then 1B models
         for model_id in ["ethos-code", "ethos-light", "ethos-phi"]:
             if AVAILABLE_MODELS[model_id]["ollama_model"] in available_models:
                 return model_id
     
-    elif any(keyword in user_message_lower for keyword in complex_keywords):
+    elif words & COMPLEX_KEYWORDS:
         # Try 3B first, then 7B, then 1B
         for model_id in ["ethos-light", "ethos-code", "ethos-sailor"]:
             if AVAILABLE_MODELS[model_id]["ollama_model"] in available_models:
                 return model_id
     
-    elif any(keyword in user_message_lower for keyword in simple_keywords):
+    elif words & SIMPLE_KEYWORDS:
         # Use fast 1B model
         for model_id in ["ethos-fast", "ethos-sailor", "ethos-phi"]:
             if AVAILABLE_MODELS[model_id]["ollama_model"] in available_models:
@@ -212,9 +346,48 @@ def select_best_model(user_message: str, available_models: List[str]) -> str:
     
     return "ethos-phi"  # Default fallback
 
+def ram_usage_report(model_id: str, generation_time: float, before=None, after=None) -> Dict:
+    """RAM usage around one generation, as returned to the client
+    
+    before/after are sample_ram() results; when RAM telemetry was not
+    requested they are None and only the timing is reported.
+    """
+    if before is None:
+        return {
+            "generation_time_seconds": round(generation_time, 2),
+            "model_used": model_id
+        }
+    (ram_before, processes_before), (ram_after, processes_after) = before, after
+    return {
+        "estimated_model_ram_gb": estimate_model_ram_usage(AVAILABLE_MODELS[model_id]["ollama_model"]),
+        "system_ram_before": ram_before,
+        "system_ram_after": ram_after,
+        "ram_change_gb": round(ram_after["used_gb"] - ram_before["used_gb"], 2),
+        "ollama_processes_before": processes_before,
+        "ollama_processes_after": processes_after,
+        "generation_time_seconds": round(generation_time, 2)
+    }
+
+def web_search_summary(search_performed: bool, search_context: str) -> Dict:
+    """Web search info for a response, with the sources detected in the search context"""
+    search_context_lower = search_context.lower()
+    return {
+        "performed": search_performed,
+        "context": search_context,
+        "sources_used": {
+            "duckduckgo": "duckduckgo" in search_context_lower,
+            "wikipedia": "wikipedia" in search_context_lower,
+            "news": "news" in search_context_lower
+        }
+    }
+
 # Generate real AI response
-def generate_ai_response(prompt: str, model_id: str, device_context: List[Dict] = None, force_web_search: bool = False) -> Dict:
-    """Generate response using real AI model with RAM monitoring and hybrid web search"""
+async def generate_ai_response(prompt: str, model_id: str, device_context: List[Dict] = None, force_web_search: bool = False, collect_ram: bool = False) -> Dict:
+    """Generate response using real AI model with hybrid web search
+    
+    RAM is only sampled around the generation when collect_ram is set, as
+    the psutil reads cost more than a short generation.
+    """
     try:
         model_info = AVAILABLE_MODELS.get(model_id)
         if not model_info:
@@ -223,63 +396,50 @@ def generate_ai_response(prompt: str, model_id: str, device_context: List[Dict]
         ollama_model = model_info["ollama_model"]
         
         # Get RAM info before generation
-        ram_before = get_system_ram_info()
-        ollama_processes_before = get_ollama_process_ram()
-        estimated_ram = estimate_model_ram_usage(ollama_model)
+        ram_before = await sample_ram() if collect_ram else None
         
         # Build context-aware prompt with hybrid search
-        prompt_data = build_context_prompt(prompt, device_context, force_web_search)
+        # Web search and RAG lookups are blocking HTTP calls, so they run in a worker thread
+        prompt_data = await asyncio.to_thread(build_context_prompt, prompt, device_context, force_web_search)
         full_prompt = prompt_data["prompt"]
         search_performed = prompt_data["search_performed"]
         search_context = prompt_data["search_context"]
         
         # Generate response using Ollama
         start_time = time.time()
-        result = subprocess.run(
-            ['ollama', 'run', ollama_model, full_prompt],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        async with OLLAMA_SEM:
+            result = await OLLAMA_CLIENT.post("/api/generate", json={
+                "model": ollama_model,
+                "prompt": full_prompt,
+                "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE
+            })
         generation_time = time.time() - start_time
         
         # Get RAM info after generation
-        ram_after = get_system_ram_info()
-        ollama_processes_after = get_ollama_process_ram()
+        ram_after = await sample_ram() if collect_ram else None
         
-        if result.returncode == 0:
-            # Calculate RAM usage
-            ram_used = {
-                "estimated_model_ram_gb": estimated_ram,
-                "system_ram_before": ram_before,
-                "system_ram_after": ram_after,
-                "ram_change_gb": round(ram_after["used_gb"] - ram_before["used_gb"], 2),
-                "ollama_processes_before": ollama_processes_before,
-                "ollama_processes_after": ollama_processes_after,
-                "generation_time_seconds": round(generation_time, 2)
-            }
-            
+        if result.status_code == 200:
             return {
-                "response": result.stdout.strip(),
-                "ram_usage": ram_used,
+                "response": result.json()["response"].strip(),
+                "ram_usage": ram_usage_report(model_id, generation_time, ram_before, ram_after),
                 "model_used": model_id,
-                "web_search": {
-                    "performed": search_performed,
-                    "context": search_context,
-                    "sources_used": {
-                        "duckduckgo": "duckduckgo" in search_context.lower(),
-                        "wikipedia": "wikipedia" in search_context.lower(),
-                        "news": "news" in search_context.lower()
-                    }
-                }
+                "web_search": web_search_summary(search_performed, search_context)
             }
         else:
-            raise Exception(f"Model generation failed: {result.stderr}")
+            if result.status_code == 404:
+                # Model not found: it was removed since the list was cached
+                invalidate_models_cache()
+            raise Exception(f"Model generation failed: {result.text}")
             
     except Exception as e:
-        logger.error(f"Error generating response: {e}")
+        logger.error("Error generating response: %s", e)
         raise e
 
+# Character budget for conversation history in a prompt (~1500 tokens); older
+# messages are dropped first so long sessions don't blow up prompt size
+MAX_CONTEXT_CHARS = 6000
+
 def build_context_prompt(prompt: str, device_context: List[Dict] = None, force_web_search: bool = False) -> Dict:
     """Build a context-aware prompt with hybrid RAG enhancement and web search memory"""
     search_performed = False
@@ -314,36 +474,66 @@ def build_context_prompt(prompt: str, device_context: List[Dict] = None, force_w
             "search_memory_used": search_memory_used
         }
     
-    # Build context from device memory
-    context_text = "\n\nPrevious conversation context:\n"
-    for item in device_context[-10:]:  # Last 10 context items
+    # Build context from device memory: the last 10 context items, newest
+    # first, until MAX_CONTEXT_CHARS is used up so the oldest are dropped
+    history = []
+    budget = MAX_CONTEXT_CHARS
+    for item in reversed(device_context[-10:]):
         role = item.get("role", "user")
         content = item.get("content", "")
         if content:
-            context_text += f"{role.capitalize()}: {content}\n"
+            line = f"{role.capitalize()}: {content}\n"
+            if len(line) > budget:
+                break
+            budget -= len(line)
+            history.append(line)
+    
+    parts = ["\n\nPrevious conversation context:\n", *reversed(history)]
     
     # Add web search memory context
     if search_memory_used:
-        context_text += "\n\nWeb search memory (available to all models):\n"
+        parts.append("\n\nWeb search memory (available to all models):\n")
         for search in search_memory_used[-5:]:  # Last 5 searches
-            context_text += f"Search: {search['query']} (Sources: {', '.join(search['sources'])})\n"
+            parts.append(f"Search: {search['query']} (Sources: {', '.join(search['sources'])})\n")
     
-    context_text += f"\nCurrent message: {enhanced_prompt}\n\nPlease respond to the current message, taking into account the conversation context and web search memory above."
+    parts.append(f"\nCurrent message: {enhanced_prompt}\n\nPlease respond to the current message, taking into account the conversation context and web search memory above.")
     
     return {
-        "prompt": context_text,
+        "prompt": "".join(parts),
         "search_performed": search_performed,
         "search_context": search_context,
         "search_memory_used": search_memory_used
     }
 
 # File processing functions
-def process_uploaded_file(file_content: bytes, filename: str) -> Dict:
-    """Process uploaded file and extract text content"""
+TEXT_EXTENSIONS = ('.txt', '.md', '.py', '.js', '.html', '.css', '.json')
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+async def process_uploaded_file(file: UploadFile) -> Dict:
+    """Process uploaded file and extract text content
+    
+    The upload is read in UPLOAD_CHUNK_SIZE pieces: text is decoded as it
+    arrives and binary content is only counted, so no full copy of the
+    raw bytes is held, and oversized uploads fail as soon as they pass
+    MAX_UPLOAD_BYTES.
+    """
     try:
+        is_text = file.filename.endswith(TEXT_EXTENSIONS)
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+            if is_text:
+                parts.append(decoder.decode(chunk))
+        
         # For text files, extract content
-        if filename.endswith(('.txt', '.md', '.py', '.js', '.html', '.css', '.json')):
-            content = file_content.decode('utf-8')
+        if is_text:
+            parts.append(decoder.decode(b'', final=True))
+            content = ''.join(parts)
             return {
                 "type": "text",
                 "content": content,
@@ -354,30 +544,34 @@ def process_uploaded_file(file_content: bytes, filename: str) -> Dict:
             return {
                 "type": "binary",
                 "content": None,
-                "size": len(file_content),
-                "summary": f"Binary file ({len(file_content)} bytes)"
+                "size": size,
+                "summary": f"Binary file ({size} bytes)"
             }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing file: {e}")
+        logger.error("Error processing file: %s", e)
         raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
 
 # API Models for client-side storage
+# Client memory is typed as bare list/dict: pydantic then only checks the
+# container type instead of validating every conversation entry
 class ClientMemoryRequest(BaseModel):
     device_id: str
-    conversations: List[Dict] = []
-    settings: Dict = {}
+    conversations: list = []
+    settings: dict = {}
 
 class ClientMemoryResponse(BaseModel):
     device_id: str
-    conversations: List[Dict]
-    settings: Dict
+    conversations: list
+    settings: dict
     total_conversations: int
     storage_size_kb: float
 
 class ChatWithMemoryRequest(BaseModel):
     message: str
     device_id: str
-    device_memory: Optional[List[Dict]] = None  # Client sends their memory
+    device_memory: Optional[list] = None  # Client sends their memory
     model_override: Optional[str] = None
     force_web_search: Optional[bool] = False
 
@@ -385,7 +579,7 @@ class ChatWithMemoryResponse(BaseModel):
     response: str
     model: str
     device_id: str
-    updated_memory: List[Dict]  # Server returns updated memory
+    updated_memory: list  # Server returns updated memory
     context_used: bool
     storage_size_kb: float
     ram_usage: Dict
@@ -398,14 +592,85 @@ if OLLAMA_AVAILABLE:
 else:
     logger.error("❌ Ollama not available - AI responses will fail")
 
+async def warm_up_models():
+    """Load the top OLLAMA_WARMUP_COUNT available models, one at a time"""
+    available_models = await get_available_ollama_models_cached()
+    warm = [
+        model_info["ollama_model"]
+        for model_info in sorted(AVAILABLE_MODELS.values(), key=lambda info: info["priority"])
+        if model_info["ollama_model"] in available_models
+    ][:OLLAMA_WARMUP_COUNT]
+    for ollama_model in warm:
+        try:
+            # An empty prompt only loads the model; large models can take minutes
+            await OLLAMA_CLIENT.post("/api/generate", json={
+                "model": ollama_model,
+                "prompt": "",
+                "keep_alive": OLLAMA_KEEP_ALIVE
+            }, timeout=300.0)
+            logger.info("Warmed up %s", ollama_model)
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s", ollama_model, e)
+
+@app.on_event("startup")
+async def start_warm_up():
+    # In the background so the server accepts requests while models load
+    app.state.warm_up_task = asyncio.create_task(warm_up_models()) if OLLAMA_AVAILABLE else None
+
+@app.on_event("shutdown")
+async def stop_warm_up():
+    if app.state.warm_up_task is not None:
+        app.state.warm_up_task.cancel()
+
+@app.on_event("shutdown")
+async def close_ollama_client():
+    await OLLAMA_CLIENT.aclose()
+
+# Bodies of the fixed compat endpoints, encoded once; they only depend on
+# OLLAMA_AVAILABLE, which is settled at import
+_EMPTY_LIST = orjson.dumps([])
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": "5.3.0-PRODUCTION",
+    "ollama_available": OLLAMA_AVAILABLE,
+    "storage_type": "client_side",
+    "production": True
+})
+
+_CONFIG_BYTES = orjson.dumps({
+    "version": "5.3.0-PRODUCTION",
+    "storage_type": "client_side",
+    "ollama_available": OLLAMA_AVAILABLE,
+    "production": True,
+    "features": {
+        "real_ai": True,
+        "client_storage": True,
+        "smart_selection": True,
+        "device_memory": True,
+        "file_upload": True
+    }
+})
+
+_MEMORY_SEARCH_BYTES = orjson.dumps({
+    "results": [],
+    "message": "Search not implemented in client-side storage version"
+})
+
+_ANALYTICS_BYTES = orjson.dumps({
+    "total_conversations": 0,
+    "total_messages": 0,
+    "storage_used": "0 KB",
+    "message": "Analytics not implemented in client-side storage version"
+})
+
 # Production endpoints
 @app.post("/api/client/memory/save", response_model=ClientMemoryResponse)
 async def save_client_memory(request: ClientMemoryRequest):
     """Client saves their memory to server (temporary, for processing)"""
     try:
         # Calculate storage size
-        memory_json = json.dumps(request.conversations)
-        storage_size_kb = len(memory_json.encode('utf-8')) / 1024
+        storage_size_kb = len(orjson.dumps(request.conversations)) / 1024
         
         return ClientMemoryResponse(
             device_id=request.device_id,
@@ -417,93 +682,107 @@ async def save_client_memory(request: ClientMemoryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# How much client memory is sent back after each chat
+MAX_MEMORY_CONVERSATIONS = 50
+MAX_MEMORY_SEARCHES = 20
+
+def build_device_context(device_memory: Optional[List[Dict]]) -> List[Dict]:
+    """Turn the last 10 conversations of client memory into chat messages"""
+    device_context = []
+    if device_memory:
+        for conv in device_memory[-10:]:  # Last 10 conversations
+            if 'message' in conv and 'response' in conv:
+                device_context.append({
+                    "role": "user",
+                    "content": conv['message']
+                })
+                device_context.append({
+                    "role": "assistant", 
+                    "content": conv['response']
+                })
+    return device_context
+
+async def select_model_for_request(request: ChatWithMemoryRequest) -> str:
+    """Honour a valid model override, otherwise pick the best available model"""
+    if request.model_override and request.model_override in AVAILABLE_MODELS:
+        return request.model_override
+    available_models = await get_available_ollama_models_cached()
+    return select_best_model(request.message, available_models)
+
+def update_device_memory(request: ChatWithMemoryRequest, response: str, selected_model: str, web_search_info: Dict) -> List[Dict]:
+    """Append the new exchange (and any web search) to the client's memory and trim it"""
+    # Create updated memory for client
+    now, timestamp = current_time()
+    new_conversation = {
+        "id": f"conv_{int(now)}",
+        "timestamp": timestamp,
+        "message": request.message,
+        "response": response,
+        "model": selected_model
+    }
+    
+    updated_memory = request.device_memory or []
+    updated_memory.append(new_conversation)
+    
+    # Store web search results in device memory if search was performed
+    if web_search_info.get("performed") and WEB_SEARCH_CONFIG["store_search_memory"]:
+        sources = []
+        if web_search_info.get("sources_used", {}).get("duckduckgo"):
+            sources.append("DuckDuckGo")
+        if web_search_info.get("sources_used", {}).get("wikipedia"):
+            sources.append("Wikipedia")
+        if web_search_info.get("sources_used", {}).get("news"):
+            sources.append("News")
+        
+        web_search_memory = {
+            "id": f"search_{int(now)}",
+            "type": "web_search",
+            "timestamp": timestamp,
+            "query": request.message,
+            "sources": sources,
+            "model_used": selected_model
+        }
+        updated_memory.append(web_search_memory)
+    
+    # Keep only last 50 conversations and 20 web searches, sorted in one pass
+    # into bounded deques that drop the oldest entries as they fill
+    conversations = deque(maxlen=MAX_MEMORY_CONVERSATIONS)
+    searches = deque(maxlen=MAX_MEMORY_SEARCHES)
+    for item in updated_memory:
+        (searches if item.get("type") == "web_search" else conversations).append(item)
+    
+    if len(conversations) + len(searches) < len(updated_memory):
+        # Something was dropped: conversations first, then web searches
+        updated_memory = [*conversations, *searches]
+    
+    return updated_memory
+
 @app.post("/api/client/chat", response_model=ChatWithMemoryResponse)
-async def chat_with_client_memory(request: ChatWithMemoryRequest):
-    """Chat endpoint that works with client-side memory and real AI models"""
+async def chat_with_client_memory(request: ChatWithMemoryRequest, x_ethos_debug: Optional[str] = Header(None)):
+    """Chat endpoint that works with client-side memory and real AI models
+    
+    Send X-Ethos-Debug: 1 to include system and Ollama RAM readings in ram_usage.
+    """
     try:
         # Process client memory to build context
-        device_context = []
-        if request.device_memory:
-            for conv in request.device_memory[-10:]:  # Last 10 conversations
-                if 'message' in conv and 'response' in conv:
-                    device_context.append({
-                        "role": "user",
-                        "content": conv['message']
-                    })
-                    device_context.append({
-                        "role": "assistant", 
-                        "content": conv['response']
-                    })
+        device_context = build_device_context(request.device_memory)
         
         # Smart model selection
-        available_models = get_available_ollama_models()
-        if request.model_override and request.model_override in AVAILABLE_MODELS:
-            selected_model = request.model_override
-        else:
-            selected_model = select_best_model(request.message, available_models)
+        selected_model = await select_model_for_request(request)
         
         # Generate real AI response with hybrid web search
         if OLLAMA_AVAILABLE:
-            response_data = generate_ai_response(request.message, selected_model, device_context, request.force_web_search)
+            response_data = await generate_ai_response(request.message, selected_model, device_context, request.force_web_search, collect_ram=x_ethos_debug == "1")
             response = response_data["response"]
             ram_usage = response_data["ram_usage"]
             web_search_info = response_data.get("web_search", {})
         else:
             raise HTTPException(status_code=503, detail="Ollama not available - AI service unavailable")
         
-        # Create updated memory for client
-        new_conversation = {
-            "id": f"conv_{int(datetime.now().timestamp())}",
-            "timestamp": datetime.now().isoformat(),
-            "message": request.message,
-            "response": response,
-            "model": selected_model
-        }
-        
-        updated_memory = request.device_memory or []
-        updated_memory.append(new_conversation)
-        
-        # Store web search results in device memory if search was performed
-        if web_search_info.get("performed") and WEB_SEARCH_CONFIG["store_search_memory"]:
-            sources = []
-            if web_search_info.get("sources_used", {}).get("duckduckgo"):
-                sources.append("DuckDuckGo")
-            if web_search_info.get("sources_used", {}).get("wikipedia"):
-                sources.append("Wikipedia")
-            if web_search_info.get("sources_used", {}).get("news"):
-                sources.append("News")
-            
-            web_search_memory = {
-                "id": f"search_{int(datetime.now().timestamp())}",
-                "type": "web_search",
-                "timestamp": datetime.now().isoformat(),
-                "query": request.message,
-                "sources": sources,
-                "model_used": selected_model
-            }
-            updated_memory.append(web_search_memory)
-        
-        # Keep only last 50 conversations and 20 web searches
-        conversation_count = sum(1 for item in updated_memory if item.get("type") != "web_search")
-        search_count = sum(1 for item in updated_memory if item.get("type") == "web_search")
-        
-        if conversation_count > 50:
-            # Remove oldest conversations, keep web searches
-            conversations = [item for item in updated_memory if item.get("type") != "web_search"]
-            searches = [item for item in updated_memory if item.get("type") == "web_search"]
-            conversations = conversations[-50:]
-            updated_memory = conversations + searches
-        
-        if search_count > 20:
-            # Remove oldest web searches
-            conversations = [item for item in updated_memory if item.get("type") != "web_search"]
-            searches = [item for item in updated_memory if item.get("type") == "web_search"]
-            searches = searches[-20:]
-            updated_memory = conversations + searches
+        updated_memory = update_device_memory(request, response, selected_model, web_search_info)
         
         # Calculate storage size
-        memory_json = json.dumps(updated_memory)
-        storage_size_kb = len(memory_json.encode('utf-8')) / 1024
+        storage_size_kb = len(orjson.dumps(updated_memory)) / 1024
         
         return ChatWithMemoryResponse(
             response=response,
@@ -517,18 +796,91 @@ async def chat_with_client_memory(request: ChatWithMemoryRequest):
         )
         
     except Exception as e:
-        logger.error(f"Chat error: {e}")
+        logger.error("Chat error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(data, event: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode()}\n\n"
+
+@app.post("/api/client/chat/stream")
+async def chat_with_client_memory_stream(request: ChatWithMemoryRequest, x_ethos_debug: Optional[str] = Header(None)):
+    """Streaming variant of /api/client/chat
+    
+    Tokens are forwarded as server-sent events ({"token": ...}) as Ollama
+    generates them; a final "done" event carries the same fields as the
+    non-streaming response, including updated_memory and ram_usage
+    (RAM readings only with X-Ethos-Debug: 1).
+    """
+    collect_ram = x_ethos_debug == "1"
+    if not OLLAMA_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Ollama not available - AI service unavailable")
+    
+    try:
+        device_context = build_device_context(request.device_memory)
+        selected_model = await select_model_for_request(request)
+        ollama_model = AVAILABLE_MODELS[selected_model]["ollama_model"]
+        prompt_data = await asyncio.to_thread(build_context_prompt, request.message, device_context, request.force_web_search)
+    except Exception as e:
+        logger.error("Chat stream error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        try:
+            ram_before = await sample_ram() if collect_ram else None
+            
+            chunks = []
+            start_time = time.time()
+            async with OLLAMA_SEM:
+                async with OLLAMA_CLIENT.stream("POST", "/api/generate", json={
+                    "model": ollama_model,
+                    "prompt": prompt_data["prompt"],
+                    "stream": True,
+                    "keep_alive": OLLAMA_KEEP_ALIVE
+                }) as result:
+                    if result.status_code != 200:
+                        if result.status_code == 404:
+                            invalidate_models_cache()
+                        raise Exception(f"Model generation failed: {(await result.aread()).decode(errors='replace')}")
+                    async for line in result.aiter_lines():
+                        if not line:
+                            continue
+                        token = orjson.loads(line).get("response", "")
+                        if token:
+                            chunks.append(token)
+                            yield sse_event({"token": token})
+            generation_time = time.time() - start_time
+            
+            # RAM usage and the updated memory are only known once generation is done
+            ram_after = await sample_ram() if collect_ram else None
+            response = "".join(chunks).strip()
+            web_search_info = web_search_summary(prompt_data["search_performed"], prompt_data["search_context"])
+            updated_memory = update_device_memory(request, response, selected_model, web_search_info)
+            
+            yield sse_event({
+                "response": response,
+                "model": selected_model,
+                "device_id": request.device_id,
+                "updated_memory": updated_memory,
+                "context_used": len(device_context) > 0,
+                "storage_size_kb": len(orjson.dumps(updated_memory)) / 1024,
+                "ram_usage": ram_usage_report(selected_model, generation_time, ram_before, ram_after),
+                "web_search": web_search_info
+            }, event="done")
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            logger.error("Chat stream error: %s", e)
+            yield sse_event({"error": str(e)}, event="error")
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Upload and process file - Production implementation"""
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Process file
-        result = process_uploaded_file(file_content, file.filename)
+        # Read and process the file in chunks
+        result = await process_uploaded_file(file)
         
         return {
             "success": True,
@@ -540,14 +892,16 @@ async def upload_file(file: UploadFile = File(...)):
                 "content": result["content"] if result["type"] == "text" else None
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Upload error: {e}")
+        logger.error("Upload error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/client/storage/info")
 async def get_storage_info():
     """Get information about client-side storage requirements"""
-    available_models = get_available_ollama_models()
+    available_models = await get_available_ollama_models_cached()
     return {
         "storage_type": "client_side",
         "ollama_available": OLLAMA_AVAILABLE,
@@ -578,54 +932,31 @@ async def get_storage_info():
 async def get_ram_usage():
     """Get current RAM usage information"""
     try:
-        system_ram = get_system_ram_info()
-        ollama_processes = get_ollama_process_ram()
-        
-        # Get model RAM estimates
-        model_ram_estimates = {}
-        for model_id, model_info in AVAILABLE_MODELS.items():
-            estimated_ram = estimate_model_ram_usage(model_info["ollama_model"])
-            model_ram_estimates[model_id] = {
-                "name": model_info["name"],
-                "estimated_ram_gb": estimated_ram,
-                "model_size": model_info["size"]
-            }
+        system_ram, ollama_processes = await sample_ram()
         
         return {
             "system_ram": system_ram,
             "ollama_processes": ollama_processes,
-            "model_estimates": model_ram_estimates,
-            "timestamp": datetime.now().isoformat()
+            "model_estimates": _MODEL_RAM_ESTIMATES,
+            "timestamp": current_time()[1]
         }
     except Exception as e:
-        logger.error(f"RAM usage error: {e}")
+        logger.error("RAM usage error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/models")
 async def get_models():
     """Get available models with real AI integration"""
     try:
-        available_models = get_available_ollama_models()
+        available_models = await get_available_ollama_models_cached()
         
-        # Create model list with availability status
-        ethos_models = []
-        for model_id, model_info in AVAILABLE_MODELS.items():
-            is_available = model_info["ollama_model"] in available_models
-            ethos_models.append({
-                "id": model_id,
-                "name": model_info["name"],
-                "type": "real_ai",
-                "provider": "ollama",
-                "enabled": True,
-                "status": "available" if is_available else "downloadable",
-                "ollama_model": model_info["ollama_model"],
-                "capabilities": model_info["capabilities"],
-                "best_for": model_info["best_for"],
-                "size": model_info["size"],
-                "priority": model_info["priority"],
-                "fusion_capable": False,
-                "reason": f"Real AI model - {', '.join(model_info['best_for'])}"
-            })
+        available_models = set(available_models)
+        
+        # Fill in availability on the prebuilt model entries
+        ethos_models = [
+            {**model, "status": "available" if model["ollama_model"] in available_models else "downloadable"}
+            for model in _MODELS_STATIC
+        ]
         
         return {
             "models": ethos_models,
@@ -643,39 +974,31 @@ async def get_models():
             "ollama_available": OLLAMA_AVAILABLE
         }
 
-@app.get("/health")
+@app.get("/health", response_class=Response)
 async def health():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "version": "5.3.0-PRODUCTION",
-        "ollama_available": OLLAMA_AVAILABLE,
-        "storage_type": "client_side",
-        "production": True
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.get("/api/models/status")
 async def get_models_status():
     """Get models status for compatibility with frontend"""
     try:
-        available_models = get_available_ollama_models()
+        available_models = await get_available_ollama_models_cached()
         
         # Create status for each model
         model_status = {}
-        for model_id, model_info in AVAILABLE_MODELS.items():
-            is_available = model_info["ollama_model"] in available_models
+        for model_id, static in _MODELS_STATUS_STATIC.items():
+            is_available = static["model"] in available_models
             model_status[model_id] = {
                 "available": is_available,
                 "status": "available" if is_available else "not_downloaded",
-                "model": model_info["ollama_model"],
-                "name": model_info["name"],
-                "size": model_info["size"]
+                **static
             }
         
         return {
             "models": model_status,
             "ollama_available": OLLAMA_AVAILABLE,
-            "total_available": len([m for m in available_models if any(m == info["ollama_model"] for info in AVAILABLE_MODELS.values())])
+            "total_available": sum(1 for m in available_models if m in _OLLAMA_MODEL_NAMES)
         }
         
     except Exception as e:
@@ -685,96 +1008,81 @@ async def get_models_status():
             "error": str(e)
         }
 
-@app.get("/api/conversations")
+@app.get("/api/conversations", response_class=Response)
 async def get_conversations():
     """Get conversations endpoint for compatibility with frontend"""
     # Since we're using client-side storage, return empty list
     # The frontend will handle conversations from device memory
-    return []
+    return Response(content=_EMPTY_LIST, media_type="application/json")
 
-@app.post("/api/conversations")
+@app.post("/api/conversations", response_class=Response)
 async def create_conversation():
     """Create conversation endpoint for compatibility with frontend"""
-    # Since we're using client-side storage, return a mock response
-    return {
-        "conversation_id": f"conv_{int(datetime.now().timestamp())}",
-        "title": "New Conversation",
-        "created_at": datetime.now().isoformat()
-    }
+    # Since we're using client-side storage, return a mock response;
+    # only the id and timestamp vary, and neither needs JSON escaping
+    now, timestamp = current_time()
+    body = b"".join((
+        b'{"conversation_id":"conv_', str(int(now)).encode(),
+        b'","title":"New Conversation","created_at":"', timestamp.encode(),
+        b'"}'
+    ))
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/conversations/{conversation_id}")
 async def get_conversation(conversation_id: str):
     """Get conversation endpoint for compatibility with frontend"""
     # Since we're using client-side storage, return empty conversation
+    timestamp = current_time()[1]
     return {
         "id": conversation_id,
         "title": "Conversation",
         "messages": [],
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
+        "created_at": timestamp,
+        "updated_at": timestamp
     }
 
-@app.get("/api/config")
+@app.get("/api/config", response_class=Response)
 async def get_config():
     """Get configuration endpoint for compatibility with frontend"""
-    return {
-        "version": "5.3.0-PRODUCTION",
-        "storage_type": "client_side",
-        "ollama_available": OLLAMA_AVAILABLE,
-        "production": True,
-        "features": {
-            "real_ai": True,
-            "client_storage": True,
-            "smart_selection": True,
-            "device_memory": True,
-            "file_upload": True
-        }
-    }
+    return Response(content=_CONFIG_BYTES, media_type="application/json")
 
-@app.get("/api/memory/search")
+@app.get("/api/memory/search", response_class=Response)
 async def search_memory():
     """Search memory endpoint for compatibility with frontend"""
-    return {
-        "results": [],
-        "message": "Search not implemented in client-side storage version"
-    }
+    return Response(content=_MEMORY_SEARCH_BYTES, media_type="application/json")
 
-@app.get("/api/memory/analytics")
+@app.get("/api/memory/analytics", response_class=Response)
 async def get_analytics():
     """Analytics endpoint for compatibility with frontend"""
-    return {
-        "total_conversations": 0,
-        "total_messages": 0,
-        "storage_used": "0 KB",
-        "message": "Analytics not implemented in client-side storage version"
-    }
+    return Response(content=_ANALYTICS_BYTES, media_type="application/json")
 
-@app.get("/api/tasks")
+@app.get("/api/tasks", response_class=Response)
 async def get_tasks():
     """Tasks endpoint for compatibility with frontend"""
-    return []
+    return Response(content=_EMPTY_LIST, media_type="application/json")
 
-@app.get("/api/documents")
+@app.get("/api/documents", response_class=Response)
 async def get_documents():
     """Documents endpoint for compatibility with frontend"""
-    return []
+    return Response(content=_EMPTY_LIST, media_type="application/json")
 
-@app.get("/api/knowledge")
+@app.get("/api/knowledge", response_class=Response)
 async def get_knowledge():
     """Knowledge endpoint for compatibility with frontend"""
-    return []
+    return Response(content=_EMPTY_LIST, media_type="application/json")
 
-@app.get("/api/citations")
+@app.get("/api/citations", response_class=Response)
 async def get_citations():
     """Citations endpoint for compatibility with frontend"""
-    return []
+    return Response(content=_EMPTY_LIST, media_type="application/json")
 
 # Web Search and RAG API Endpoints
 @app.post("/api/web-search")
 async def web_search(query: str):
     """Perform web search using all available sources"""
     try:
-        results = web_apis.search_all_sources(query)
+        # The searches are blocking HTTP calls, so they run in a worker thread
+        results = await asyncio.to_thread(web_apis.search_all_sources, query)
         return {
             "success": True,
             "query": query,
@@ -786,7 +1094,7 @@ async def web_search(query: str):
             }
         }
     except Exception as e:
-        logger.error(f"Web search error: {e}")
+        logger.error("Web search error: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -905,7 +1213,7 @@ async def delete_specific_search(search_id: str, device_id: str):
 
 @app.get("/")
 async def root():
-    available_models = get_available_ollama_models()
+    available_models = await get_available_ollama_models_cached()
     return {
         "message": "Ethos AI - Production Client-Side Storage with Real AI Models",
         "version": "5.3.0-PRODUCTION",
@@ -925,4 +1233,4 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -5,17 +5,44 @@ Runs 3B and 7B models directly on Railway - no local server needed!
 """
 
 import asyncio
-import json
+import copy
 import logging
 import time
-import subprocess
-from typing import Dict, List, Optional, Any
+import hashlib
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import os
+import re
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Request bodies are sent pre-encoded by orjson, so the client sets the content type
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Unified responses kept for repeated questions (LRU)
+RESPONSE_CACHE_SIZE = 1024
+# Learning entries kept overall and per message type
+LEARNING_HISTORY_SIZE = 10000
+RESPONSE_PATTERN_SIZE = 500
+# Interactions counted as "recent" by the performance trend
+RECENT_TREND_SIZE = 10
+# Routing: for each combination of matched request categories, the last
+# ROUTER_WINDOW confidences of every model subset seen answering it. The
+# smallest subset within ROUTER_MARGIN of the best mean (and at least
+# ROUTER_CONFIDENCE) replaces the keyword selection
+ROUTER_WINDOW = 100
+ROUTER_MIN_SAMPLES = 20
+ROUTER_CONFIDENCE = 0.85
+ROUTER_MARGIN = 0.05
+# A base model answer at least this confident skips the larger models
+CASCADE_CONFIDENCE = 0.9
+# Concurrent Ollama calls allowed per model
+MODEL_CONCURRENCY = int(os.environ.get("ETHOS_MODEL_CONCURRENCY", "2"))
+
 class ModelType(Enum):
     FAST = "fast"           # 3B models for quick responses
     CODE = "code"           # Code-specific models
@@ -43,7 +70,39 @@ class CloudEthosFusionEngine:
     Cloud-Only Ethos Fusion Engine - No local server needed!
     """
     
-    def __init__(self):
+    # Request keywords, matched at the start of a word so "debugging" or
+    # "functions" still count but "show" no longer matches "how"
+    _CODE_RE = re.compile(r"\b(?:code|program|debug|function|class|api)", re.IGNORECASE)
+    _ANALYSIS_RE = re.compile(r"\b(?:analyze|explain|research|compare|why|how)", re.IGNORECASE)
+    _CREATIVE_RE = re.compile(r"\b(?:write|story|creative|describe|narrative)", re.IGNORECASE)
+    # Selection categories, in the order the keyword rules check them
+    _ROUTING_CATEGORIES = (("code", _CODE_RE), ("analysis", _ANALYSIS_RE), ("creative", _CREATIVE_RE))
+    _PRIVACY_RE = re.compile(r"\b(?:data|privacy|security|personal)", re.IGNORECASE)
+    # Narrower sets used to bucket messages for learning
+    _PROGRAMMING_TYPE_RE = re.compile(r"\b(?:code|program|debug)", re.IGNORECASE)
+    _ANALYSIS_TYPE_RE = re.compile(r"\b(?:explain|analyze|research)", re.IGNORECASE)
+    _CREATIVE_TYPE_RE = re.compile(r"\b(?:write|create|story)", re.IGNORECASE)
+    # Technical vocabulary found in one scan over the response
+    _TECHNICAL_TERMS = {
+        term.lower(): term for term in (
+            "algorithm", "function", "class", "method", "variable", "loop", "condition",
+            "database", "API", "framework", "library", "protocol", "architecture",
+            "optimization", "performance", "scalability", "security", "testing"
+        )
+    }
+    _TECHNICAL_RE = re.compile(r"\b(%s)" % "|".join(_TECHNICAL_TERMS), re.IGNORECASE)
+    
+    def __init__(self, ollama_url: str = "http://localhost:11434", response_cache_size: int = RESPONSE_CACHE_SIZE):
+        self.ollama_url = ollama_url
+        # Unified responses by (models, message) digest, oldest first
+        self._response_cache_size = response_cache_size
+        self._response_cache: OrderedDict[bytes, EthosResponse] = OrderedDict()
+        # Generations in progress by the same key, shared by identical concurrent requests
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        # Keep-alive client for Ollama's HTTP API, created on first use
+        self._http_client = None
+        # How long Ollama keeps a model loaded after each call
+        self.keep_alive = "30m"
         self.model_registry = {
             "llama3.2:3b": {
                 "type": ModelType.FAST,
@@ -83,10 +142,28 @@ class CloudEthosFusionEngine:
             ]
         }
         
+        # Fixed per-model system prompts, built once. Sent as Ollama's system field,
+        # they form an identical prefix on every call that Ollama can reuse from its cache
+        self._system_prompts = {
+            name: self._build_system_prompt(name, info) for name, info in self.model_registry.items()
+        }
+        
+        # Bounds in-flight generations per model so bursts queue here instead of in Ollama
+        self._model_semaphores = {name: asyncio.Semaphore(MODEL_CONCURRENCY) for name in self.model_registry}
+        
         # Learning and improvement tracking
-        self.learning_history = []
+        self.learning_history = deque(maxlen=LEARNING_HISTORY_SIZE)
         self.response_patterns = {}
         self.capability_insights = {}
+        # Running confidence aggregates behind the performance trend
+        self._recent_confidence = deque(maxlen=RECENT_TREND_SIZE)
+        self._older_confidence_sum = 0.0
+        self._older_confidence_count = 0
+        # Matched categories -> model subset -> recent confidences, used for routing
+        self._subset_confidence: Dict[tuple, Dict[tuple, deque]] = {}
+        # Interactions waiting to be learned from, drained by a background task
+        self._learn_queue = asyncio.Queue()
+        self._learn_task = None
         
     async def generate_unified_response(self, message: str, context: Dict[str, Any] = None) -> EthosResponse:
         """
@@ -97,64 +174,141 @@ class CloudEthosFusionEngine:
         # Step 1: Analyze the request and determine which models to use
         model_selection = self._select_models_for_request(message, context)
         
+        # Repeated questions are answered from the cache without calling any model
+        cache_key = self._response_cache_key(message, model_selection)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            # Callers get their own copy so changing it can't alter later hits
+            return copy.copy(cached)
+        
+        # An identical request already being answered is awaited instead of repeated
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._generate_uncached_response(message, context, model_selection, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # Shielded so one caller going away does not cancel the others' answer;
+        # the result is also the cached object, so each caller gets a copy
+        return copy.copy(await asyncio.shield(task))
+    
+    async def _generate_uncached_response(self, message: str, context: Optional[Dict[str, Any]], model_selection: List[str], cache_key: bytes) -> EthosResponse:
+        """
+        Run the selected models and fuse their answers into one response
+        """
         # Step 2: Get responses from selected models
         model_responses = await self._get_model_responses(message, model_selection)
         
         # Step 3: Synthesize responses into unified Ethos response
         unified_response = self._synthesize_responses(message, model_responses, context)
+        if model_responses:
+            self._cache_response(cache_key, unified_response)
         
-        # Step 4: Learn from this interaction
-        self._learn_from_interaction(message, model_responses, unified_response)
+        # Step 4: Learn from this interaction once the response is on its way
+        self._ensure_learn_worker()
+        self._learn_queue.put_nowait((message, model_responses, unified_response))
         
         return unified_response
     
+    def _response_cache_key(self, message: str, model_names: List[str]) -> bytes:
+        """Digest of the model set and the message, ignoring whitespace differences"""
+        normalized = " ".join(message.split())
+        return hashlib.blake2b(f"{','.join(sorted(model_names))}\0{normalized}".encode(), digest_size=16).digest()
+    
+    def _cache_response(self, key: bytes, response: EthosResponse):
+        if self._response_cache_size > 0:
+            self._response_cache[key] = response
+            if len(self._response_cache) > self._response_cache_size:
+                self._response_cache.popitem(last=False)
+    
     def _select_models_for_request(self, message: str, context: Dict[str, Any] = None) -> List[str]:
         """
         Intelligently select which models to use based on the request
         """
-        message_lower = message.lower()
         selected_models = []
+        categories = self._request_categories(message)
         
         # Always start with the most reliable (smallest) model
         selected_models.append("llama3.2:3b")
         
         # Add specialized models based on content
-        if any(word in message_lower for word in ["code", "program", "debug", "function", "class", "api"]):
+        if "code" in categories:
             selected_models.append("codellama:7b")
             
-        if any(word in message_lower for word in ["analyze", "explain", "research", "compare", "why", "how"]):
-            if "codellama:7b" not in selected_models:
-                selected_models.append("codellama:7b")
+        if "analysis" in categories:
+            selected_models.append("codellama:7b")
             
-        if any(word in message_lower for word in ["write", "story", "creative", "describe", "narrative"]):
-            if "codellama:7b" not in selected_models:
-                selected_models.append("codellama:7b")
+        if "creative" in categories:
+            selected_models.append("codellama:7b")
         
-        # Remove duplicates
-        selected_models = list(set(selected_models))
+        # Remove duplicates, keeping selection order
+        selected_models = list(dict.fromkeys(selected_models))
         
+        # Code requests always keep the code model; otherwise history may show fewer models do as well
+        if "code" not in categories and len(selected_models) > 1:
+            learned = self._learned_selection(categories, selected_models)
+            if learned:
+                return learned
         return selected_models
     
+    def _request_categories(self, message: str) -> tuple:
+        """
+        Names of the selection categories whose keywords appear in the message
+        """
+        return tuple(name for name, pattern in self._ROUTING_CATEGORIES if pattern.search(message))
+    
+    def _learned_selection(self, categories: tuple, candidates: List[str]) -> Optional[List[str]]:
+        """
+        Smallest subset of the candidates that has recently done about as well as the best one
+        
+        Only subsets keeping the first (base) candidate are considered, so the
+        router can drop the larger models but never the base one.
+        """
+        scored = []
+        for models, history in self._subset_confidence.get(categories, {}).items():
+            if len(history) >= ROUTER_MIN_SAMPLES and candidates[0] in models and set(models) <= set(candidates):
+                scored.append((sum(history) / len(history), models))
+        if not scored:
+            return None
+        best = max(mean for mean, _ in scored)
+        eligible = [models for mean, models in scored if mean >= ROUTER_CONFIDENCE and mean >= best - ROUTER_MARGIN]
+        if not eligible:
+            return None
+        chosen = min(eligible, key=len)
+        return [model for model in candidates if model in chosen]
+    
     async def _get_model_responses(self, message: str, model_names: List[str]) -> List[ModelResponse]:
         """
         Get responses from multiple models concurrently
         """
-        tasks = []
-        for model_name in model_names:
-            task = self._get_single_model_response(message, model_name)
-            tasks.append(task)
+        # The first (smallest) model answers first; the rest only run if it was not confident enough
+        base_response = None
+        if len(model_names) > 1:
+            base_response = await self._get_guarded_model_response(message, model_names[0])
+            if base_response is not None and base_response.confidence >= CASCADE_CONFIDENCE:
+                return [base_response]
+            model_names = model_names[1:]
         
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._get_guarded_model_response(message, model_name)) for model_name in model_names]
         
         # Filter out failed responses
-        valid_responses = []
-        for response in responses:
-            if isinstance(response, ModelResponse):
-                valid_responses.append(response)
-            else:
-                logger.warning(f"Model response failed: {response}")
-        
-        return valid_responses
+        responses = [task.result() for task in tasks if task.result() is not None]
+        if base_response is not None:
+            responses.insert(0, base_response)
+        return responses
+    
+    async def _get_guarded_model_response(self, message: str, model_name: str) -> Optional[ModelResponse]:
+        """
+        Get one model's response within its concurrency limit, or None if it failed
+        """
+        try:
+            async with self._model_semaphores[model_name]:
+                return await self._get_single_model_response(message, model_name)
+        except Exception as e:
+            # One failing model must not cancel the others in the group
+            logger.warning("Model response failed: %s", e)
+            return None
     
     async def _get_single_model_response(self, message: str, model_name: str) -> ModelResponse:
         """
@@ -166,19 +320,15 @@ class CloudEthosFusionEngine:
             # Create Ethos-specific prompt
             ethos_prompt = self._create_ethos_prompt(message, model_name)
             
-            # Use subprocess to call ollama directly
-            result = subprocess.run(
-                [
-                    'ollama', 'run', model_name,
-                    ethos_prompt
-                ],
-                capture_output=True,
-                text=True,
-                timeout=self._get_timeout_for_model(model_name)
+            # Models stay loaded in Ollama between calls instead of a CLI process per call
+            response = await self._get_http_client().post(
+                "/api/generate",
+                content=orjson.dumps(self._generate_payload(ethos_prompt, model_name, stream=False)),
+                timeout=httpx.Timeout(self._get_timeout_for_model(model_name), connect=5.0)
             )
             
-            if result.returncode == 0:
-                response_text = result.stdout.strip()
+            if response.status_code == 200:
+                response_text = orjson.loads(response.content).get("response", "").strip()
                 response_time = time.time() - start_time
                 
                 # Calculate confidence based on response quality
@@ -193,22 +343,161 @@ class CloudEthosFusionEngine:
                     capabilities=self.model_registry[model_name]["capabilities"]
                 )
             else:
-                raise Exception(f"Model {model_name} failed: {result.stderr}")
+                raise Exception(f"Model {model_name} failed: {response.text}")
                 
-        except subprocess.TimeoutExpired:
+        except httpx.TimeoutException:
             logger.error(f"Timeout getting response from {model_name}")
             raise
         except Exception as e:
             logger.error(f"Error getting response from {model_name}: {e}")
             raise
     
-    def _create_ethos_prompt(self, message: str, model_name: str) -> str:
+    def _generate_payload(self, prompt: str, model_name: str, stream: bool) -> Dict[str, Any]:
+        """Ollama /api/generate body for one model call"""
+        return {
+            "model": model_name,
+            "system": self._system_prompts[model_name],
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive
+        }
+    
+    async def stream_unified_response(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
         """
-        Create an Ethos-specific prompt that incorporates personality and knowledge
+        Stream the base model's answer as it is generated, ending with the Ethos touch
+        
+        Only the first selected model is streamed; fusing in the larger models
+        needs their full text, so that stays with generate_unified_response.
+        Answers already cached or being generated for the same message are
+        sent whole. Failures end the stream with the same apology
+        generate_unified_response returns.
+        
+        Library-only for now: no server mounts this engine yet (railway_fusion_main
+        serves EthosFusionEngine), so a streaming route must be added by whichever
+        server adopts it.
         """
-        model_info = self.model_registry[model_name]
+        model_selection = self._select_models_for_request(message, context)
+        model_name = model_selection[0]
+        
+        # The streamed answer comes from the base model alone, so it is cached under that selection
+        stream_key = self._response_cache_key(message, [model_name])
+        for key in dict.fromkeys((self._response_cache_key(message, model_selection), stream_key)):
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+                yield cached.final_response
+                return
+            task = self._inflight.get(key)
+            if task is not None:
+                yield (await asyncio.shield(task)).final_response
+                return
+        
+        # Ollama is read by a separate task so a slow reader does not hold the model's slot
+        tokens = asyncio.Queue()
+        task = asyncio.create_task(self._stream_model_response(message, context, model_name, stream_key, tokens))
+        self._inflight[stream_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(stream_key, None))
+        
+        streamed = []
+        while (token := await tokens.get()) is not None:
+            streamed.append(token)
+            yield token
+        unified_response = await asyncio.shield(task)
+        
+        # The streamed text is the start of the final response; send the rest
+        yield unified_response.final_response[len("".join(streamed).strip()):]
+    
+    async def _stream_model_response(self, message: str, context: Optional[Dict[str, Any]], model_name: str, cache_key: bytes, tokens: asyncio.Queue) -> EthosResponse:
+        """
+        Put one model's tokens on the queue as Ollama produces them (None marks the end), then fuse the full text
+        """
+        start_time = time.time()
+        chunks = []
+        failed = False
+        try:
+            async with self._model_semaphores[model_name]:
+                async with self._get_http_client().stream(
+                    "POST",
+                    "/api/generate",
+                    content=orjson.dumps(self._generate_payload(self._create_ethos_prompt(message, model_name), model_name, stream=True)),
+                    timeout=httpx.Timeout(self._get_timeout_for_model(model_name), connect=5.0)
+                ) as response:
+                    if response.status_code != 200:
+                        raise Exception(f"Model {model_name} failed: {(await response.aread()).decode(errors='replace')}")
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        token = orjson.loads(line).get("response", "")
+                        if token:
+                            chunks.append(token)
+                            tokens.put_nowait(token)
+        except Exception as e:
+            logger.error("Error streaming response from %s: %s", model_name, e)
+            failed = True
+        finally:
+            tokens.put_nowait(None)
+        
+        # A stream that broke off after some tokens still answers with what arrived
+        model_responses = []
+        if chunks or not failed:
+            response_text = "".join(chunks).strip()
+            model_responses.append(ModelResponse(
+                model_name=model_name,
+                response=response_text,
+                confidence=self._calculate_confidence(response_text, model_name),
+                response_time=time.time() - start_time,
+                model_type=self.model_registry[model_name]["type"],
+                capabilities=self.model_registry[model_name]["capabilities"]
+            ))
+        
+        unified_response = self._synthesize_responses(message, model_responses, context)
+        if model_responses:
+            self._cache_response(cache_key, unified_response)
+        
+        self._ensure_learn_worker()
+        self._learn_queue.put_nowait((message, model_responses, unified_response))
         
-        prompt = f"""You are Ethos AI, a privacy-first, cloud-based AI system. 
+        return unified_response
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled client shared by all model calls"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(base_url=self.ollama_url, headers=_JSON_HEADERS)
+        return self._http_client
+    
+    def _ensure_learn_worker(self):
+        if self._learn_task is None:
+            self._learn_task = asyncio.create_task(self._learn_worker())
+    
+    async def _learn_worker(self):
+        """Apply queued interactions to the learning state, one at a time"""
+        while True:
+            entry = await self._learn_queue.get()
+            self._apply_learning(entry)
+    
+    def _apply_learning(self, entry):
+        try:
+            self._learn_from_interaction(*entry)
+        except Exception as e:
+            logger.error("Learning update failed: %s", e)
+    
+    async def aclose(self):
+        """Stop the learning worker and close the Ollama HTTP client"""
+        if self._learn_task is not None:
+            self._learn_task.cancel()
+            self._learn_task = None
+        # Anything still queued is applied before shutting down
+        while not self._learn_queue.empty():
+            self._apply_learning(self._learn_queue.get_nowait())
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def _build_system_prompt(self, model_name: str, model_info: Dict[str, Any]) -> str:
+        """
+        Build the fixed Ethos identity and personality prompt for a model
+        """
+        return f"""You are Ethos AI, a privacy-first, cloud-based AI system. 
 
 Your core values:
 - Privacy-first approach
@@ -229,11 +518,14 @@ You are using the {model_name} model, which is best at: {', '.join(model_info['b
 
 Current capabilities: {', '.join(model_info['capabilities'])}
 
-User message: {message}
-
 Respond as Ethos AI, incorporating your unique personality and values while leveraging the strengths of the {model_name} model. Be helpful, accurate, and true to the Ethos identity."""
-
-        return prompt
+    
+    def _create_ethos_prompt(self, message: str, model_name: str) -> str:
+        """
+        Create the per-request part of the prompt; the Ethos personality and
+        knowledge go in the model's precomputed system prompt
+        """
+        return f"User message: {message}"
     
     def _synthesize_responses(self, original_message: str, model_responses: List[ModelResponse], context: Dict[str, Any] = None) -> EthosResponse:
         """
@@ -311,27 +603,16 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         """
         Extract technical terms from text
         """
-        technical_keywords = [
-            "algorithm", "function", "class", "method", "variable", "loop", "condition",
-            "database", "API", "framework", "library", "protocol", "architecture",
-            "optimization", "performance", "scalability", "security", "testing"
-        ]
-        
-        found_terms = []
-        text_lower = text.lower()
-        
-        for term in technical_keywords:
-            if term in text_lower:
-                found_terms.append(term)
-        
-        return found_terms
+        # Distinct terms in order of first appearance
+        found = dict.fromkeys(match.lower() for match in self._TECHNICAL_RE.findall(text))
+        return [self._TECHNICAL_TERMS[term] for term in found]
     
     def _add_ethos_touch(self, response: str, original_message: str) -> str:
         """
         Add Ethos-specific personality and style to the response
         """
         # Add privacy-conscious elements
-        if any(word in original_message.lower() for word in ["data", "privacy", "security", "personal"]):
+        if self._PRIVACY_RE.search(original_message):
             response += "\n\n💡 **Privacy Note**: As Ethos AI, I process everything in the cloud and never store or share your data."
         
         # Add learning elements
@@ -389,12 +670,29 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         
         self.learning_history.append(learning_entry)
         
+        # Confidence leaving the recent window moves into the older aggregate
+        if len(self._recent_confidence) == self._recent_confidence.maxlen:
+            self._older_confidence_sum += self._recent_confidence[0]
+            self._older_confidence_count += 1
+        self._recent_confidence.append(final_response.confidence)
+        
         # Update response patterns
         message_type = self._classify_message_type(message)
         if message_type not in self.response_patterns:
-            self.response_patterns[message_type] = []
+            self.response_patterns[message_type] = deque(maxlen=RESPONSE_PATTERN_SIZE)
         self.response_patterns[message_type].append(learning_entry)
         
+        # Update routing: the fused answer scores the subset that ran, and each
+        # model's own answer scores it as a subset on its own
+        subsets = self._subset_confidence.setdefault(self._request_categories(message), {})
+        samples = [((response.model_name,), response.confidence) for response in model_responses]
+        if len(model_responses) > 1:
+            samples.append((tuple(sorted(r.model_name for r in model_responses)), final_response.confidence))
+        for models, confidence in samples:
+            if models not in subsets:
+                subsets[models] = deque(maxlen=ROUTER_WINDOW)
+            subsets[models].append(confidence)
+        
         # Update capability insights
         for capability in final_response.capabilities_used:
             if capability not in self.capability_insights:
@@ -410,13 +708,11 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         """
         Classify the type of message for learning patterns
         """
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["code", "program", "debug"]):
+        if self._PROGRAMMING_TYPE_RE.search(message):
             return "programming"
-        elif any(word in message_lower for word in ["explain", "analyze", "research"]):
+        elif self._ANALYSIS_TYPE_RE.search(message):
             return "analysis"
-        elif any(word in message_lower for word in ["write", "create", "story"]):
+        elif self._CREATIVE_TYPE_RE.search(message):
             return "creative"
         elif "?" in message:
             return "question"
@@ -442,12 +738,12 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         if model_info["type"] == ModelType.CODE:
             confidence += 0.05
         
-        # Cap at 1.0
-        return min(confidence, 1.0)
+        # Cap at 1.0, rounded so 0.7 + 0.1 + 0.1 compares equal to 0.9
+        return round(min(confidence, 1.0), 2)
     
     def _get_timeout_for_model(self, model_name: str) -> int:
         """
-        Get appropriate timeout for each model
+        Get appropriate timeout (seconds) for each model's HTTP call
         """
         if "7b" in model_name:
             return 120  # 2 minutes
@@ -460,7 +756,7 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         """
         return {
             "total_interactions": len(self.learning_history),
-            "response_patterns": self.response_patterns,
+            "response_patterns": {message_type: list(entries) for message_type, entries in self.response_patterns.items()},
             "capability_insights": self.capability_insights,
             "performance_trends": self._calculate_performance_trends()
         }
@@ -469,15 +765,13 @@ Respond as Ethos AI, incorporating your unique personality and values while leve
         """
         Calculate performance trends over time
         """
-        if len(self.learning_history) < 2:
+        if len(self._recent_confidence) + self._older_confidence_count < 2:
             return {"trend": "insufficient_data"}
         
-        recent_confidence = [entry["final_confidence"] for entry in self.learning_history[-10:]]
-        avg_recent = sum(recent_confidence) / len(recent_confidence)
+        avg_recent = sum(self._recent_confidence) / len(self._recent_confidence)
         
-        older_confidence = [entry["final_confidence"] for entry in self.learning_history[:-10]]
-        if older_confidence:
-            avg_older = sum(older_confidence) / len(older_confidence)
+        if self._older_confidence_count:
+            avg_older = self._older_confidence_sum / self._older_confidence_count
             trend = "improving" if avg_recent > avg_older else "declining"
         else:
             trend = "stable"
@@ -8,7 +8,7 @@ import logging
 import sqlite3
 import json
 import time
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from pathlib import Path
 import aiosqlite
 
@@ -74,6 +74,23 @@ class Database:
                     )
                 """)
                 
+                # Create tasks table (automation task snapshots)
+                await db.execute("""
+                    CREATE TABLE IF NOT EXISTS tasks (
+                        id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        task_type TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        priority INTEGER,
+                        created_at REAL NOT NULL,
+                        scheduled_for REAL,
+                        started_at REAL,
+                        completed_at REAL,
+                        error TEXT,
+                        metadata TEXT
+                    )
+                """)
+                
                 # Create indexes
                 await db.execute("CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id)")
                 await db.execute("CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp)")
@@ -157,23 +174,49 @@ class Database:
                 
                 rows = await cursor.fetchall()
                 
-                conversations = []
-                for row in rows:
-                    conversations.append({
-                        "id": row["id"],
-                        "title": row["title"],
-                        "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["created_at"])),
-                        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["updated_at"])),
-                        "message_count": row["message_count"],
-                        "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
-                    })
-                
-                return conversations
+                return [self._conversation_from_row(row) for row in rows]
                 
         except Exception as e:
             logger.error(f"Error getting conversations: {e}")
             return []
     
+    async def iter_conversations(self, batch_size: int = 100) -> AsyncIterator[Dict]:
+        """Yield every conversation, fetching rows from SQLite in batches
+        
+        Callers stream the rows after their response has started, so errors
+        are logged and end the iteration instead of propagating.
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                
+                cursor = await db.execute("""
+                    SELECT id, title, created_at, updated_at, message_count, metadata
+                    FROM conversations
+                    ORDER BY updated_at DESC
+                """)
+                
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._conversation_from_row(row)
+                        
+        except Exception as e:
+            logger.error(f"Error iterating conversations: {e}")
+    
+    @staticmethod
+    def _conversation_from_row(row) -> Dict:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["created_at"])),
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["updated_at"])),
+            "message_count": row["message_count"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
+        }
+    
     async def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """Get a specific conversation with its messages"""
         try:
@@ -292,6 +335,31 @@ class Database:
             logger.error(f"Error deleting conversation: {e}")
             return False
     
+    async def upsert_tasks(self, rows: List[Dict[str, Any]]):
+        """Insert or update a batch of task snapshots in one transaction"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.executemany("""
+                    INSERT INTO tasks (id, name, task_type, status, priority, created_at,
+                                       scheduled_for, started_at, completed_at, error, metadata)
+                    VALUES (:id, :name, :task_type, :status, :priority, :created_at,
+                            :scheduled_for, :started_at, :completed_at, :error, :metadata)
+                    ON CONFLICT(id) DO UPDATE SET
+                        status = excluded.status,
+                        scheduled_for = excluded.scheduled_for,
+                        started_at = excluded.started_at,
+                        completed_at = excluded.completed_at,
+                        error = excluded.error,
+                        metadata = excluded.metadata
+                """, rows)
+                await db.commit()
+            
+            logger.debug(f"Upserted {len(rows)} tasks")
+            
+        except Exception as e:
+            logger.error(f"Error upserting tasks: {e}")
+            raise
+    
     async def set_preference(self, key: str, value: Any) -> bool:
         """Set a user preference"""
         try: